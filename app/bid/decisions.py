@@ -0,0 +1,183 @@
+import uuid
+
+from sqlalchemy import (
+    Select,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.bid.models import (
+    Bid,
+    BidDecision,
+    BidDecisionTally,
+    BidDecisionType,
+    BidResponsible,
+    BidStatusType,
+    BidVersion,
+)
+from app.conditional import version_condition
+from app.organization.models import OrganizationResponsible
+from app.tender.models import Tender, TenderStatusType, TenderVersion
+from app.versioning import versioned_ctes
+
+QUORUM_LIMIT = 3
+
+BID_COLUMNS = [column for column in Bid.__table__.c if column.computed is None]
+
+
+def submit_decision_query(
+    bid_id: uuid.UUID,
+    decision: BidDecisionType,
+    username: str,
+    if_match: str | None = None,
+) -> Select:
+    """
+    Решение по предложению целиком в одном запросе.
+
+    Запрос записывает решение, увеличивает счётчики решений в
+    bid_decision_tally, считает ответственных за организацию предложения
+    и затем либо отклоняет только это предложение, либо закрывает его
+    тендер, если набран кворум min(3, max(ответственных, 1)) и отказов не
+    было. Все изменения статусов версионируются.
+
+    Строка результата содержит поля предложения после решения, статус и
+    тип услуги тендера до решения, decision_id (NULL, если решение не
+    записано из-за проверок) и closed_tender_id (не NULL, если тендер
+    закрыт этим решением). Если предложения нет, строк нет.
+    """
+    state = (
+        select(
+            *BID_COLUMNS,
+            Tender.status.label("tender_status"),
+            Tender.service_type.label("tender_service_type"),
+        )
+        .join(Tender, Bid.tender_id == Tender.id)
+        .where(Bid.id == bid_id)
+        .cte("state")
+    )
+    allowed = (
+        select(state.c.id, state.c.tender_id)
+        .where(
+            state.c.status == BidStatusType.Published,
+            state.c.tender_status != TenderStatusType.Closed,
+            version_condition(state.c.version, if_match),
+        )
+        .cte("allowed")
+    )
+
+    decision_value = literal(decision, BidDecision.__table__.c.decision.type)
+    recorded = (
+        insert(BidDecision)
+        .from_select(
+            ["id", "bid_id", "decision", "username"],
+            select(
+                func.gen_random_uuid(),
+                allowed.c.id,
+                decision_value,
+                literal(username),
+            ),
+        )
+        .returning(BidDecision.id)
+        .cte("recorded")
+    )
+
+    # Upsert берёт блокировку строки счётчиков и возвращает её значения
+    # после всех уже зафиксированных решений: параллельные решения по
+    # предложению выстраиваются в очередь на этой строке, а не на таблице.
+    counted = pg_insert(BidDecisionTally).from_select(
+        ["bid_id", "approved", "rejected"],
+        select(
+            allowed.c.id,
+            literal(int(decision == BidDecisionType.Approved)),
+            literal(int(decision == BidDecisionType.Rejected)),
+        ),
+    )
+    tally = (
+        counted.on_conflict_do_update(
+            index_elements=[BidDecisionTally.bid_id],
+            set_={
+                "approved": BidDecisionTally.approved + counted.excluded.approved,
+                "rejected": BidDecisionTally.rejected + counted.excluded.rejected,
+            },
+        )
+        .returning(BidDecisionTally.approved, BidDecisionTally.rejected)
+        .cte("tally")
+    )
+    quorum = (
+        select(func.least(QUORUM_LIMIT, func.greatest(func.count(), 1)).label("size"))
+        .where(
+            OrganizationResponsible.organization_id.in_(
+                select(BidResponsible.organization_id).where(
+                    BidResponsible.bid_id == bid_id
+                )
+            )
+        )
+        .cte("quorum")
+    )
+
+    if decision == BidDecisionType.Rejected:
+        canceled, history = versioned_ctes(
+            update(Bid)
+            .values(status=BidStatusType.Canceled, version=Bid.version + 1)
+            .where(
+                Bid.id.in_(select(allowed.c.id)),
+                Bid.status == BidStatusType.Published,
+            ),
+            Bid,
+            BidVersion,
+            "bid_id",
+            name="canceled",
+        )
+        outcome = canceled
+        overrides = {
+            "status": func.coalesce(canceled.c.status, state.c.status),
+            "version": func.coalesce(canceled.c.version, state.c.version),
+        }
+        closed_tender_id = literal(None, Tender.id.type)
+    else:
+        closed, history = versioned_ctes(
+            update(Tender)
+            .values(status=TenderStatusType.Closed, version=Tender.version + 1)
+            .where(
+                Tender.id.in_(select(allowed.c.tender_id)),
+                # Условие перепроверяется после ожидания блокировки строки,
+                # поэтому тендер закрывается ровно одним решением.
+                Tender.status != TenderStatusType.Closed,
+                exists().where(
+                    tally.c.rejected == 0,
+                    tally.c.approved >= quorum.c.size,
+                ),
+            ),
+            Tender,
+            TenderVersion,
+            "tender_id",
+            name="closed",
+        )
+        outcome = closed
+        overrides = {}
+        closed_tender_id = closed.c.id
+
+    return (
+        select(
+            *(
+                overrides.get(column.key, state.c[column.key]).label(column.key)
+                for column in BID_COLUMNS
+            ),
+            state.c.tender_status,
+            state.c.tender_service_type,
+            recorded.c.id.label("decision_id"),
+            closed_tender_id.label("closed_tender_id"),
+        )
+        .select_from(state)
+        .outerjoin(recorded, true())
+        .outerjoin(outcome, true())
+        # Отказ не читает счётчики, но они должны обновиться и в этом случае.
+        .add_cte(tally)
+        .add_cte(history)
+    )
@@ -11,6 +11,7 @@ from sqlalchemy import (
     func,
     Index,
     UniqueConstraint,
+    text,
 )
 
 from app.database import Base
@@ -67,6 +68,15 @@ class Bid(Base):
             "author_id",
             name="uq_tender_bid",
         ),
+        Index("ix_bid_tender_id_status", "tender_id", "status"),
+        Index(
+            "ix_bid_published_tender_id",
+            "tender_id",
+            "name",
+            "id",
+            postgresql_where=text("status = 'Published'"),
+        ),
+        Index("ix_bid_author_id_name", "author_id", "name", "id"),
     )
 
 
@@ -74,17 +84,20 @@ class BidVersion(Base):
     __tablename__ = "bid_version"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    name: Mapped[str] = mapped_column(String(100))
-    description: Mapped[str] = mapped_column(Text())
-    status: Mapped[BidStatusType]
-    author_type: Mapped[BidAuthorType]
-    author_id: Mapped[uuid.UUID] = mapped_column(
+    # Поля, не изменившиеся относительно предыдущей версии, равны NULL
+    # во всех строках, кроме снимков (is_snapshot).
+    name: Mapped[str | None] = mapped_column(String(100))
+    description: Mapped[str | None] = mapped_column(Text())
+    status: Mapped[BidStatusType | None]
+    author_type: Mapped[BidAuthorType | None]
+    author_id: Mapped[uuid.UUID | None] = mapped_column(
         ForeignKey("employee.id", ondelete="CASCADE"),
     )
-    tender_id: Mapped[uuid.UUID] = mapped_column(
+    tender_id: Mapped[uuid.UUID | None] = mapped_column(
         ForeignKey("tender.id", ondelete="CASCADE"),
     )
     version: Mapped[int] = mapped_column(default=1)
+    is_snapshot: Mapped[bool] = mapped_column(default=True)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=func.current_timestamp()
     )
@@ -97,6 +110,7 @@ class BidVersion(Base):
             "version > 0",
             name="check_version_minimum",
         ),
+        Index("ix_bid_version_bid_id_version", "bid_id", "version"),
     )
 
 
@@ -112,6 +126,10 @@ class BidReview(Base):
         TIMESTAMP, server_default=func.current_timestamp()
     )
 
+    __table_args__ = (
+        Index("ix_bid_review_bid_id_created_at", "bid_id", "created_at", "id"),
+    )
+
 
 class BidDecision(Base):
     __tablename__ = "bid_decision"
@@ -123,6 +141,26 @@ class BidDecision(Base):
     decision: Mapped[BidDecisionType]
     username: Mapped[str] = mapped_column(String(50))
 
+    __table_args__ = (Index("ix_bid_decision_bid_id", "bid_id"),)
+
+
+class BidDecisionTally(Base):
+    """
+    Счётчики решений по предложению.
+
+    Обновляются атомарным upsert при каждом решении, поэтому параллельные
+    решения по одному предложению видят разные значения счётчиков.
+    """
+
+    __tablename__ = "bid_decision_tally"
+
+    bid_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("bid.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    approved: Mapped[int] = mapped_column(server_default=text("0"))
+    rejected: Mapped[int] = mapped_column(server_default=text("0"))
+
 
 class BidResponsible(Base):
     __tablename__ = "bid_responsible"
@@ -135,3 +173,5 @@ class BidResponsible(Base):
         ForeignKey("organization.id", ondelete="CASCADE"),
         nullable=True,
     )
+
+    __table_args__ = (Index("ix_bid_responsible_bid_id", "bid_id"),)
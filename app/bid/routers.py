@@ -1,22 +1,48 @@
 import uuid
-from fastapi import APIRouter, HTTPException
+from typing import Iterable
+
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.exc import NoResultFound, IntegrityError
-from sqlalchemy import insert, select, or_, and_, update
+from sqlalchemy import Select, insert, select, or_, and_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bid.models import (
     Bid,
     BidReview,
     BidVersion,
-    BidDecision,
     BidResponsible,
     BidAuthorType,
     BidStatusType,
     BidDecisionType,
 )
 from app.user.models import User
+from app.user.identity import get_user_by_username
 from app.tender.models import Tender, TenderStatusType
-from app.organization.models import OrganizationResponsible, Organization
+from app.tender.cache import invalidate_published_pages
+from app.organization.membership import membership_index
+from app.changes.bus import ChangeEvent
+from app.changes.streams import (
+    SSE_HEADERS,
+    SSE_MEDIA_TYPE,
+    bid_streams,
+    status_events,
+)
+from app.bulk import BulkItemResult, copy_to_staging, read_items, validate_items
+from app.conditional import (
+    etag_matches,
+    version_condition,
+    version_etag,
+    version_matches,
+)
 from app.database import async_session_maker
+from app.export import ExportFormat, export_response
+from app.serialization import ListSerializer, schema_columns, serialize_list
+from app.pagination import paginate, set_next_cursor
+from app.versioning import load_version, versioned_write
+from app.bid.decisions import submit_decision_query
 from app.bid.schemas import (
     BidCreateSchema,
     BidSchema,
@@ -30,6 +56,133 @@ router = APIRouter(
     tags=["Bids"],
 )
 
+BID_KEYSET = (Bid.name, Bid.id)
+BID_REVIEW_KEYSET = (BidReview.created_at, BidReview.id)
+
+BID_LIST = ListSerializer(BidSchema)
+BID_REVIEW_LIST = ListSerializer(BidDecisionSchema)
+
+
+async def can_manage_bid(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    bid: Bid | BidVersion,
+    organization_id: uuid.UUID | None,
+) -> bool:
+    if bid.author_type == BidAuthorType.User and bid.author_id == user_id:
+        return True
+    return await membership_index.is_responsible(session, user_id, organization_id)
+
+
+async def get_listed_tender(session: AsyncSession, tender_id: uuid.UUID) -> Tender:
+    """
+    Тендер, предложения которого можно просматривать: Published или Closed.
+    """
+    get_tender_query = select(Tender).where(
+        and_(
+            Tender.id == tender_id,
+            or_(
+                Tender.status == TenderStatusType.Published,
+                Tender.status == TenderStatusType.Closed,
+            ),
+        )
+    )
+    tender = await session.execute(get_tender_query)
+
+    try:
+        return tender.scalar_one()
+    except NoResultFound:
+        raise HTTPException(
+            status_code=404,
+            detail="Такого тендера нет",
+        )
+
+
+def visible_bids_query(
+    tender_id: uuid.UUID,
+    user_id: uuid.UUID,
+    organizations: Iterable[uuid.UUID],
+    schema: type[BaseModel] | None = None,
+) -> Select:
+    """
+    Предложения тендера, видимые пользователю: опубликованные, созданные им лично
+    или от имени организации из organizations, за которую он отвечает.
+
+    Со schema выбираются только столбцы её полей, иначе объекты Bid.
+    """
+    columns = schema_columns(Bid, schema) if schema is not None else [Bid]
+
+    return (
+        select(*columns)
+        .join(
+            BidResponsible,
+            Bid.id == BidResponsible.bid_id,
+        )
+        .where(
+            and_(
+                Bid.tender_id == tender_id,
+                or_(
+                    BidResponsible.organization_id.in_(organizations),
+                    and_(
+                        Bid.author_id == user_id,
+                        Bid.author_type == BidAuthorType.User,
+                    ),
+                    Bid.status == BidStatusType.Published,
+                ),
+            ),
+        )
+    )
+
+
+async def tender_bids_query(
+    session: AsyncSession,
+    tender_id: uuid.UUID,
+    user_id: uuid.UUID,
+    schema: type[BaseModel] | None = None,
+) -> Select:
+    organizations = await membership_index.organizations(session, user_id)
+    return visible_bids_query(tender_id, user_id, organizations, schema)
+
+
+def user_bids_query(
+    user_id: uuid.UUID,
+    schema: type[BaseModel] | None = None,
+) -> Select:
+    columns = schema_columns(Bid, schema) if schema is not None else [Bid]
+    return select(*columns).where(Bid.author_id == user_id)
+
+
+def bid_state_query(bid_id: uuid.UUID) -> Select:
+    """
+    Предложение и организация, от имени которой оно создано.
+    """
+    return (
+        select(Bid, BidResponsible.organization_id)
+        .join(
+            BidResponsible,
+            Bid.id == BidResponsible.bid_id,
+        )
+        .where(Bid.id == bid_id)
+    )
+
+
+def bid_reviews_query(tender_id: uuid.UUID, author_id: uuid.UUID) -> Select:
+    """
+    Отзывы на предложения автора author_id в тендере tender_id.
+    """
+    return (
+        select(*schema_columns(BidReview, BidDecisionSchema))
+        .select_from(BidReview)
+        .join(
+            Bid,
+            BidReview.bid_id == Bid.id,
+        )
+        .where(
+            Bid.tender_id == tender_id,
+            Bid.author_id == author_id,
+        )
+    )
+
 
 @router.post("/new")
 async def create_bid(bid: BidCreateSchema) -> BidSchema:
@@ -60,38 +213,37 @@ async def create_bid(bid: BidCreateSchema) -> BidSchema:
                 status_code=401,
                 detail="Такого пользователя нет",
             )
-        organization_resp = None
+        organization_id = None
         if bid.author_type == BidAuthorType.Organization:
-            get_organization_query = select(OrganizationResponsible).where(
-                OrganizationResponsible.user_id == bid.author_id
+            organizations = await membership_index.organizations(
+                session, bid.author_id
             )
-            organization_resp = await session.execute(get_organization_query)
 
-            try:
-                organization_resp = organization_resp.scalar_one()
-            except NoResultFound:
+            if len(organizations) != 1:
                 raise HTTPException(
                     status_code=401,
                     detail="Данной организации нет",
                 )
+            (organization_id,) = organizations
 
-            if organization_resp.organization_id == tender.organization_id:
+            if organization_id == tender.organization_id:
                 raise HTTPException(
                     status_code=401,
                     detail="Нельзя создать предложение от имени своей организации для своей организации",
                 )
 
-        create_bid_query = (
-            insert(Bid)
-            .values(
+        create_bid_query = versioned_write(
+            insert(Bid).values(
                 name=bid.name,
                 description=bid.description,
                 author_type=bid.author_type,
                 tender_id=bid.tender_id,
                 status=BidStatusType.Created,
                 author_id=bid.author_id,
-            )
-            .returning(Bid)
+            ),
+            Bid,
+            BidVersion,
+            "bid_id",
         )
 
         try:
@@ -101,76 +253,200 @@ async def create_bid(bid: BidCreateSchema) -> BidSchema:
                 status_code=400,
                 detail="Данное предложение уже было создано для тендера",
             )
-        await session.commit()
         bid_db = bid_db.scalar_one()
 
         create_bid_resp_query = insert(
             BidResponsible,
         ).values(
             bid_id=bid_db.id,
-            organization_id=organization_resp.organization_id
-            if organization_resp is not None
-            else None,
+            organization_id=organization_id,
         )
-
-        create_bid_version_query = insert(BidVersion).values(
-            name=bid_db.name,
-            description=bid_db.description,
-            author_type=bid_db.author_type,
-            tender_id=bid_db.tender_id,
-            status=BidStatusType.Created,
-            author_id=bid_db.author_id,
-            bid_id=bid_db.id,
-        )
-        await session.execute(create_bid_version_query)
         await session.execute(create_bid_resp_query)
         await session.commit()
 
         return bid_db
 
 
+BID_BULK_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "status",
+    "author_type",
+    "author_id",
+    "tender_id",
+    "version",
+)
+
+
+@router.post("/bulk")
+async def create_bids_bulk(request: Request) -> list[BulkItemResult]:
+    """
+    Массовое создание предложений. Тело - JSON-массив или NDJSON из объектов, как в /bids/new.
+
+    Тендеры и авторы проверяются общими запросами на весь пакет, конфликты и ошибки возвращаются для каждого элемента отдельно.
+    """
+    items = await read_items(request)
+    bids, results = validate_items(items, BidCreateSchema)
+
+    async with async_session_maker() as session:
+        tenders_query = select(Tender.id, Tender.organization_id).where(
+            Tender.id.in_({bid.tender_id for _, bid in bids}),
+            Tender.status == TenderStatusType.Published,
+        )
+        tenders = dict((await session.execute(tenders_query)).all())
+
+        authors_query = select(User.id).where(
+            User.id.in_({bid.author_id for _, bid in bids})
+        )
+        authors = set((await session.execute(authors_query)).scalars())
+
+        records = {}
+        responsibles = {}
+        for index, bid in bids:
+            if bid.tender_id not in tenders:
+                results[index] = BulkItemResult(index=index, error="Такого тендера нет")
+                continue
+            if bid.author_id not in authors:
+                results[index] = BulkItemResult(
+                    index=index, error="Такого пользователя нет"
+                )
+                continue
+
+            organization_id = None
+            if bid.author_type == BidAuthorType.Organization:
+                organizations = await membership_index.organizations(
+                    session, bid.author_id
+                )
+                if len(organizations) != 1:
+                    results[index] = BulkItemResult(
+                        index=index, error="Данной организации нет"
+                    )
+                    continue
+                (organization_id,) = organizations
+
+                if organization_id == tenders[bid.tender_id]:
+                    results[index] = BulkItemResult(
+                        index=index,
+                        error="Нельзя создать предложение от имени своей организации для своей организации",
+                    )
+                    continue
+
+            bid_id = uuid.uuid4()
+            records[index] = (
+                bid_id,
+                bid.name,
+                bid.description,
+                BidStatusType.Created.name,
+                bid.author_type.name,
+                bid.author_id,
+                bid.tender_id,
+                1,
+            )
+            responsibles[bid_id] = organization_id
+
+        created = set()
+        if records:
+            staging = await copy_to_staging(
+                session, Bid.__table__, BID_BULK_COLUMNS, records.values()
+            )
+            query = versioned_write(
+                pg_insert(Bid)
+                .from_select(BID_BULK_COLUMNS, select(staging))
+                .on_conflict_do_nothing(constraint="uq_tender_bid"),
+                Bid,
+                BidVersion,
+                "bid_id",
+            )
+            result = await session.execute(query)
+            created = {bid.id for bid in result.scalars()}
+
+            if created:
+                await session.execute(
+                    insert(BidResponsible),
+                    [
+                        {"bid_id": bid_id, "organization_id": responsibles[bid_id]}
+                        for bid_id in created
+                    ],
+                )
+            await session.commit()
+
+        for index, record in records.items():
+            if record[0] in created:
+                results[index] = BulkItemResult(index=index, id=record[0])
+            else:
+                results[index] = BulkItemResult(
+                    index=index,
+                    error="Данное предложение уже было создано для тендера",
+                )
+
+        return [results[index] for index in sorted(results)]
+
+
 @router.get("/my")
 async def get_user_bids(
     username: str,
+    response: Response,
     limit: int = 5,
     offset: int = 0,
+    cursor: str | None = None,
 ):
     """
     Получение списка предложений текущего пользователя.
 
-    Для удобства использования включена поддержка пагинации.
+    Для удобства использования включена поддержка пагинации: по offset или по курсору из заголовка X-Next-Cursor.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
-
-        query = (
-            select(Bid)
-            .where(
-                Bid.author_id == user.id,
-            )
-            .limit(limit)
-            .offset(offset)
+        user = await get_user_by_username(session, username)
+
+        query = paginate(
+            user_bids_query(user.id, BidSchema),
+            BID_KEYSET,
+            limit,
+            offset,
+            cursor,
         )
 
         result = await session.execute(query)
+        bids = result.all()
+        set_next_cursor(response, bids, BID_KEYSET, limit)
+
+        return serialize_list(BID_LIST, bids, response, mappings=True)
 
-        return result.scalars().all()
+
+@router.get("/export")
+async def export_bids(
+    username: str,
+    tender_id: uuid.UUID | None = None,
+    format: ExportFormat = ExportFormat.ndjson,
+) -> StreamingResponse:
+    """
+    Выгрузка предложений потоком NDJSON или CSV.
+
+    Без tender_id выгружаются предложения пользователя, как в /bids/my, с tender_id - предложения тендера, видимые пользователю, как в /bids/{tender_id}/list.
+    """
+    async with async_session_maker() as session:
+        user = await get_user_by_username(session, username)
+
+        if tender_id is None:
+            query = user_bids_query(user.id)
+            schema = BidAllFieldsSchema
+        else:
+            await get_listed_tender(session, tender_id)
+            query = await tender_bids_query(session, tender_id, user.id)
+            schema = BidSchema
+
+    return export_response(query.order_by(*BID_KEYSET), schema, format)
 
 
 @router.get("/{tender_id}/list")
 async def get_tender_bids(
     tender_id: uuid.UUID,
     username: str,
+    response: Response,
     limit: int = 5,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[BidSchema]:
     """
     Получение предложений, связанных с указанным тендером.
@@ -179,131 +455,105 @@ async def get_tender_bids(
     либо для пользователя, ответственного за организацию, которая создала данное предложение.
     """
     async with async_session_maker() as session:
-        get_tender_query = select(Tender).where(
-            and_(
-                Tender.id == tender_id,
-                or_(
-                    Tender.status == TenderStatusType.Published,
-                    Tender.status == TenderStatusType.Closed,
-                ),
-            )
-        )
-        tender = await session.execute(get_tender_query)
-
-        try:
-            tender = tender.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=404,
-                detail="Такого тендера нет",
-            )
-
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
-
-        subquery_main = (
-            select(Bid)
-            .select_from(Bid)
-            .join(
-                BidResponsible,
-                Bid.id == BidResponsible.bid_id,
-            )
-            .outerjoin(
-                OrganizationResponsible,
-                BidResponsible.organization_id
-                == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    Bid.tender_id == tender_id,
-                    or_(
-                        OrganizationResponsible.user_id == user.id,
-                        and_(
-                            Bid.author_id == user.id,
-                            Bid.author_type == BidAuthorType.User,
-                        ),
-                        Bid.status == BidStatusType.Published,
-                    ),
-                ),
-            )
-            .limit(limit)
-            .offset(offset)
-        )
-        subquery_publish = select(Bid).where(
-            Bid.status == BidStatusType.Published,
-        )
+        await get_listed_tender(session, tender_id)
 
-        query = subquery_main.union(subquery_publish)
+        user = await get_user_by_username(session, username)
+        query = await tender_bids_query(session, tender_id, user.id, BidSchema)
+        query = paginate(query, BID_KEYSET, limit, offset, cursor)
 
         bids = await session.execute(query)
+        bids = bids.all()
+        set_next_cursor(response, bids, BID_KEYSET, limit)
 
-        return bids.mappings().all()
+        return serialize_list(BID_LIST, bids, response)
 
 
 @router.get("/{bid_id}/status")
 async def get_bid_status(
     bid_id: uuid.UUID,
     username: str,
+    response: Response,
+    if_none_match: str | None = Header(None),
 ) -> BidStatusType:
     """
     Получить статус предложения по его уникальному идентификатору.
 
     Предложение показывается для пользователя, ответственного за организацию, которая создала данное предложение. Если организации нет, то для пользователя создавшего данное предложение.
+
+    В заголовке ETag возвращается версия предложения, на If-None-Match с той же версией возвращается 304.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
+        user = await get_user_by_username(session, username)
+
+        bid = await session.execute(bid_state_query(bid_id))
+        bid = bid.one_or_none()
+
+        if bid is None or not await can_manage_bid(session, user.id, *bid):
             raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
+                status_code=404,
+                detail="Такого предложения нет",
             )
+        bid, _ = bid
 
-        get_bid_query = (
-            select(Bid)
-            .select_from(Bid)
-            .join(
-                BidResponsible,
-                Bid.id == BidResponsible.bid_id,
-            )
-            .outerjoin(
-                OrganizationResponsible,
-                BidResponsible.organization_id
-                == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    Bid.id == bid_id,
-                    or_(
-                        OrganizationResponsible.user_id == user.id,
-                        and_(
-                            Bid.author_id == user.id,
-                            Bid.author_type == BidAuthorType.User,
-                        ),
-                    ),
-                ),
-            )
-        )
-        bid = await session.execute(get_bid_query)
+        etag = version_etag(bid.version)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return bid.status
 
-        try:
-            bid = bid.scalar_one()
-        except NoResultFound:
+
+@router.get("/{bid_id}/events")
+async def bid_events(
+    bid_id: uuid.UUID,
+    username: str,
+) -> StreamingResponse:
+    """
+    Поток Server-Sent Events со статусом и версией предложения.
+
+    Доступ такой же, как у GET /bids/{bid_id}/status. Первое событие содержит текущее состояние, следующие приходят после фиксации изменений предложения. Поток закрывается, если предложение удалено или перестало быть доступно пользователю.
+    """
+    async with async_session_maker() as session:
+        user = await get_user_by_username(session, username)
+
+        bid = await session.execute(bid_state_query(bid_id))
+        bid = bid.one_or_none()
+
+        if bid is None or not await can_manage_bid(session, user.id, *bid):
             raise HTTPException(
                 status_code=404,
                 detail="Такого предложения нет",
             )
+        bid, organization_id = bid
 
-        return bid.status
+    async def load_state() -> dict | None:
+        async with async_session_maker() as session:
+            query = select(Bid.status, Bid.version).where(Bid.id == bid_id)
+            result = await session.execute(query)
+            state = result.one_or_none()
+
+            if state is None or not await can_manage_bid(
+                session, user.id, bid, organization_id
+            ):
+                return None
+            return {"status": state.status.value, "version": state.version}
+
+    async def next_state(event: ChangeEvent) -> dict | None:
+        if event.payload is None:
+            return None
+
+        async with async_session_maker() as session:
+            if not await can_manage_bid(session, user.id, bid, organization_id):
+                return None
+        return {
+            "status": event.payload["status"],
+            "version": event.payload["version"],
+        }
+
+    return StreamingResponse(
+        status_events(bid_streams, bid_id, load_state, next_state),
+        media_type=SSE_MEDIA_TYPE,
+        headers=SSE_HEADERS,
+    )
 
 
 @router.put("/{bid_id}/status")
@@ -311,60 +561,31 @@ async def edit_bid_status(
     bid_id: uuid.UUID,
     status: BidStatusType,
     username: str,
+    response: Response,
+    if_match: str | None = Header(None),
 ) -> BidSchema:
     """
     Изменить статус предложения по его уникальному идентификатору.
 
     Предложение показывается для пользователя, ответственного за организацию, которая создала данное предложение. Если организации нет, то для пользователя создавшего данное предложение.
+
+    Если передан If-Match, статус меняется только при совпадении версии предложения, иначе возвращается 412.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
-        get_bid_query = (
-            select(Bid)
-            .select_from(Bid)
-            .join(
-                BidResponsible,
-                Bid.id == BidResponsible.bid_id,
-            )
-            .outerjoin(
-                OrganizationResponsible,
-                BidResponsible.organization_id
-                == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    Bid.id == bid_id,
-                    or_(
-                        OrganizationResponsible.user_id == user.id,
-                        and_(
-                            Bid.author_id == user.id,
-                            Bid.author_type == BidAuthorType.User,
-                        ),
-                    ),
-                ),
-            )
-        )
-        bid = await session.execute(get_bid_query)
+        bid = await session.execute(bid_state_query(bid_id))
+        bid = bid.one_or_none()
 
-        try:
-            bid = bid.scalar_one()
-        except NoResultFound:
+        if bid is None or not await can_manage_bid(session, user.id, *bid):
             raise HTTPException(
                 status_code=404,
                 detail="Такого предложения нет",
             )
+        bid, _ = bid
 
         if bid.status != status:
-            update_bid_query = (
+            update_bid_query = versioned_write(
                 update(Bid)
                 .values(
                     status=status,
@@ -372,28 +593,30 @@ async def edit_bid_status(
                 )
                 .where(
                     Bid.id == bid_id,
-                )
-                .returning(Bid)
+                    version_condition(Bid.version, if_match),
+                ),
+                Bid,
+                BidVersion,
+                "bid_id",
             )
             update_bid = await session.execute(update_bid_query)
-            await session.commit()
-            update_bid = update_bid.scalar_one()
-
-            create_bid_version_query = insert(BidVersion).values(
-                name=update_bid.name,
-                description=update_bid.description,
-                author_type=update_bid.author_type,
-                tender_id=update_bid.tender_id,
-                status=BidStatusType.Created,
-                version=update_bid.version,
-                author_id=update_bid.author_id,
-                bid_id=update_bid.id,
-            )
-            await session.execute(create_bid_version_query)
+            update_bid = update_bid.scalar_one_or_none()
+            if update_bid is None:
+                raise HTTPException(
+                    status_code=412,
+                    detail="Версия предложения изменилась",
+                )
             await session.commit()
 
+            response.headers["ETag"] = version_etag(update_bid.version)
             return update_bid
 
+        if not version_matches(bid.version, if_match):
+            raise HTTPException(
+                status_code=412,
+                detail="Версия предложения изменилась",
+            )
+        response.headers["ETag"] = version_etag(bid.version)
         return bid
 
 
@@ -402,65 +625,36 @@ async def edit_bid(
     bid_id: uuid.UUID,
     username: str,
     bid_update: BidUpdateSchema,
+    response: Response,
+    if_match: str | None = Header(None),
 ) -> BidSchema:
     """
     Редактирование существующего предложения.
 
     Предложение может изменить пользователь, ответственный за организацию, которая создала данное предложение. Если организации нет, может изменить пользователь создавший данное предложение.
+
+    Если передан If-Match, изменения применяются только при совпадении версии предложения, иначе возвращается 412.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
-        get_bid_query = (
-            select(Bid)
-            .select_from(Bid)
-            .join(
-                BidResponsible,
-                Bid.id == BidResponsible.bid_id,
-            )
-            .outerjoin(
-                OrganizationResponsible,
-                BidResponsible.organization_id
-                == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    Bid.id == bid_id,
-                    or_(
-                        OrganizationResponsible.user_id == user.id,
-                        and_(
-                            Bid.author_id == user.id,
-                            Bid.author_type == BidAuthorType.User,
-                        ),
-                    ),
-                ),
-            )
-        )
-        bid = await session.execute(get_bid_query)
+        bid = await session.execute(bid_state_query(bid_id))
+        bid = bid.one_or_none()
 
-        try:
-            bid = bid.scalar_one()
-        except NoResultFound:
+        if bid is None or not await can_manage_bid(session, user.id, *bid):
             raise HTTPException(
                 status_code=404,
                 detail="Такого предложения нет",
             )
+        bid, _ = bid
 
         update_values = {}
         for key, value in bid_update:
-            if value != "" or value is not None:
+            if value != "" and value is not None:
                 update_values[key] = value
 
         if update_values:
-            update_bid_query = (
+            update_bid_query = versioned_write(
                 update(Bid)
                 .values(
                     **update_values,
@@ -468,27 +662,30 @@ async def edit_bid(
                 )
                 .where(
                     Bid.id == bid_id,
-                )
-                .returning(Bid)
+                    version_condition(Bid.version, if_match),
+                ),
+                Bid,
+                BidVersion,
+                "bid_id",
             )
             update_bid = await session.execute(update_bid_query)
-            await session.commit()
-            update_bid = update_bid.scalar_one()
-
-            create_bid_version_query = insert(BidVersion).values(
-                name=update_bid.name,
-                description=update_bid.description,
-                author_type=update_bid.author_type,
-                tender_id=update_bid.tender_id,
-                status=BidStatusType.Created,
-                version=update_bid.version,
-                author_id=update_bid.author_id,
-                bid_id=update_bid.id,
-            )
-            await session.execute(create_bid_version_query)
+            update_bid = update_bid.scalar_one_or_none()
+            if update_bid is None:
+                raise HTTPException(
+                    status_code=412,
+                    detail="Версия предложения изменилась",
+                )
             await session.commit()
 
+            response.headers["ETag"] = version_etag(update_bid.version)
             return update_bid
+
+        if not version_matches(bid.version, if_match):
+            raise HTTPException(
+                status_code=412,
+                detail="Версия предложения изменилась",
+            )
+        response.headers["ETag"] = version_etag(bid.version)
         return bid
 
 
@@ -497,114 +694,52 @@ async def submit_bid_decision(
     bid_id: uuid.UUID,
     decision: BidDecisionType,
     username: str,
-):
+    response: Response,
+    if_match: str | None = Header(None),
+) -> BidAllFieldsSchema:
     """
     Отправить решение (одобрить или отклонить) по предложению.
 
     Данное решение принимает пользователь отвественный за организацию, которая создала тендер, если предложение статус Published.
+
+    Решение записывается, а кворум проверяется одним запросом (см. submit_decision_query): отклонение отменяет только это предложение, набранный кворум закрывает тендер.
+
+    Если передан If-Match, решение принимается только при совпадении версии предложения, иначе возвращается 412.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        await get_user_by_username(session, username)
 
-        get_bid_query = select(Bid).where(
-            Bid.id == bid_id,
-            Bid.status == BidStatusType.Published,
-        )
-        bid = await session.execute(get_bid_query)
+        query = submit_decision_query(bid_id, decision, username, if_match)
+        result = await session.execute(query)
+        bid = result.one_or_none()
 
-        try:
-            bid = bid.scalar_one()
-        except NoResultFound:
+        if bid is None or (
+            bid.decision_id is None and bid.status != BidStatusType.Published
+        ):
             raise HTTPException(
                 status_code=401,
                 detail="Такого предложения нет",
             )
 
-        get_tender_query = select(Tender).where(Tender.id == bid.tender_id)
-        tender = await session.execute(get_tender_query)
-
-        try:
-            tender = tender.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого тендера нет",
-            )
-
-        if tender.status == TenderStatusType.Closed:
+        if bid.decision_id is None:
+            # Решение не записано: либо версия не совпала, либо тендер закрыт.
+            if not version_matches(bid.version, if_match):
+                raise HTTPException(
+                    status_code=412,
+                    detail="Версия предложения изменилась",
+                )
             raise HTTPException(
                 status_code=401,
                 detail="Данный тендер уже закрыт",
             )
 
-        resonsible_users_query = (
-            select(BidResponsible)
-            .select_from(BidResponsible)
-            .outerjoin(
-                OrganizationResponsible,
-                BidResponsible.organization_id
-                == OrganizationResponsible.organization_id,
-            )
-            .where(BidResponsible.bid_id == bid_id)
-        )
-        resonsible_users = await session.execute(resonsible_users_query)
-
-        resonsible_users = resonsible_users.scalars().all()
-        count_resp_users = len(resonsible_users)
-
-        bid_decision_query = insert(BidDecision).values(
-            bid_id=bid_id,
-            decision=decision,
-            username=username,
-        )
-        await session.execute(bid_decision_query)
         await session.commit()
 
-        if decision == BidDecisionType.Rejected:
-            bid_query = (
-                update(Bid)
-                .values(
-                    status=BidStatusType.Canceled,
-                )
-                .returning(Bid)
-            )
-
-            bid = await session.execute(bid_query)
-            await session.commit()
-
-            return bid.scalar_one()
-
-        bid_decisions_query = select(BidDecision).where(BidDecision.bid_id == bid_id)
-        bid_decisions = await session.execute(bid_decisions_query)
-        bid_decisions = bid_decisions.scalars().all()
-
-        if any(
-            decision.decision == BidDecisionType.Rejected for decision in bid_decisions
-        ):
-            return bid
-
-        quorum_size = min(3, max(count_resp_users, 1))
+    if bid.closed_tender_id is not None:
+        invalidate_published_pages((bid.tender_status, bid.tender_service_type))
 
-        if quorum_size <= len(bid_decisions):
-            tender_close_query = (
-                update(Tender)
-                .values(
-                    status=TenderStatusType.Closed,
-                )
-                .where(Tender.id == bid.tender_id)
-            )
-
-            await session.execute(tender_close_query)
-            await session.commit()
-    return bid
+    response.headers["ETag"] = version_etag(bid.version)
+    return BidAllFieldsSchema.model_validate(bid, from_attributes=True)
 
 
 @router.put("/{bid_id}/feedback")
@@ -612,50 +747,48 @@ async def bid_feedback(
     bid_id: uuid.UUID,
     bid_feedback: str,
     username: str,
+    response: Response,
+    if_match: str | None = Header(None),
 ) -> BidSchema:
     """
     Отправить отзыв по предложению.
 
     Фидбек отправляет пользователь отвественный за организацию, которая создала тендер, если предложение статус Published.
+
+    Если передан If-Match, отзыв сохраняется только при совпадении версии предложения, иначе возвращается 412.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
         get_bid_query = (
-            select(Bid)
-            .select_from(Bid)
+            select(Bid, Tender.organization_id)
             .join(
                 Tender,
                 Bid.tender_id == Tender.id,
             )
-            .outerjoin(
-                OrganizationResponsible,
-                Tender.organization_id == OrganizationResponsible.organization_id,
-            )
             .where(
                 Bid.id == bid_id,
-                OrganizationResponsible.user_id == user.id,
                 Bid.status == BidStatusType.Published,
             )
         )
 
         bid = await session.execute(get_bid_query)
+        bid = bid.one_or_none()
 
-        try:
-            bid = bid.scalar_one()
-        except NoResultFound:
+        if bid is None or not await membership_index.is_responsible(
+            session, user.id, bid.organization_id
+        ):
             raise HTTPException(
                 status_code=404,
                 detail="Такого предложения нет",
             )
+        bid, _ = bid
+
+        if not version_matches(bid.version, if_match):
+            raise HTTPException(
+                status_code=412,
+                detail="Версия предложения изменилась",
+            )
 
         insert_bid_review_query = insert(BidReview).values(
             description=bid_feedback,
@@ -664,6 +797,7 @@ async def bid_feedback(
         await session.execute(insert_bid_review_query)
         await session.commit()
 
+        response.headers["ETag"] = version_etag(bid.version)
         return bid
 
 
@@ -672,58 +806,35 @@ async def bid_rollback(
     bid_id: uuid.UUID,
     version: int,
     username: str,
+    response: Response,
+    if_match: str | None = Header(None),
 ):
     """
     Откатить параметры предложения к указанной версии. Это считается новой правкой, поэтому версия инкрементируется.
+
+    Если передан If-Match, откат выполняется только при совпадении текущей версии предложения, иначе возвращается 412.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
-        get_bid_query = (
-            select(BidVersion)
-            .select_from(BidVersion)
-            .join(
-                BidResponsible,
-                BidVersion.bid_id == BidResponsible.bid_id,
-            )
-            .outerjoin(
-                OrganizationResponsible,
-                BidResponsible.organization_id
-                == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    BidVersion.bid_id == bid_id,
-                    or_(
-                        OrganizationResponsible.user_id == user.id,
-                        and_(
-                            BidVersion.author_id == user.id,
-                            BidVersion.author_type == BidAuthorType.User,
-                        ),
-                    ),
-                    BidVersion.version == version,
-                ),
+        bid_version = await load_version(session, BidVersion, "bid_id", bid_id, version)
+
+        organization_id = await session.execute(
+            select(BidResponsible.organization_id).where(
+                BidResponsible.bid_id == bid_id
             )
         )
-        bid_version = await session.execute(get_bid_query)
+        organization_id = organization_id.scalar_one_or_none()
 
-        try:
-            bid_version = bid_version.scalar_one()
-        except NoResultFound:
+        if bid_version is None or not await can_manage_bid(
+            session, user.id, bid_version, organization_id
+        ):
             raise HTTPException(
                 status_code=404,
                 detail="Такого предложения нет",
             )
 
-        update_bid_query = (
+        update_bid_query = versioned_write(
             update(Bid)
             .values(
                 name=bid_version.name,
@@ -736,26 +847,22 @@ async def bid_rollback(
             )
             .where(
                 Bid.id == bid_id,
-            )
-            .returning(Bid)
+                version_condition(Bid.version, if_match),
+            ),
+            Bid,
+            BidVersion,
+            "bid_id",
         )
         update_bid = await session.execute(update_bid_query)
-        await session.commit()
-        update_bid = update_bid.scalar_one()
-
-        create_bid_version_query = insert(BidVersion).values(
-            name=update_bid.name,
-            description=update_bid.description,
-            author_type=update_bid.author_type,
-            tender_id=update_bid.tender_id,
-            status=BidStatusType.Created,
-            version=update_bid.version,
-            author_id=update_bid.author_id,
-            bid_id=update_bid.id,
-        )
-        await session.execute(create_bid_version_query)
+        update_bid = update_bid.scalar_one_or_none()
+        if update_bid is None:
+            raise HTTPException(
+                status_code=412,
+                detail="Версия предложения изменилась",
+            )
         await session.commit()
 
+        response.headers["ETag"] = version_etag(update_bid.version)
         return update_bid
 
 
@@ -764,70 +871,43 @@ async def tender_reviews(
     tender_id: uuid.UUID,
     author_username: str,
     requester_username: str,
+    response: Response,
     limit: int = 5,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[BidDecisionSchema]:
     """
     Ответственный за организацию может посмотреть прошлые отзывы на предложения автора, который создал предложение для его тендера.
     """
     async with async_session_maker() as session:
-        requester_user_query = select(User).where(User.username == requester_username)
-        requester_user = await session.execute(requester_user_query)
-        try:
-            requester_user = requester_user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        requester_user = await get_user_by_username(session, requester_username)
 
-        author_user_query = select(User).where(User.username == author_username)
-        author_user = await session.execute(author_user_query)
-        try:
-            author_user = author_user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        author_user = await get_user_by_username(session, author_username)
 
-        get_requester_user_tender_query = (
-            select(Tender)
-            .select_from(Tender)
-            .outerjoin(
-                OrganizationResponsible,
-                Tender.organization_id == OrganizationResponsible.organization_id,
-            )
-            .where(
-                Tender.id == tender_id,
-                OrganizationResponsible.user_id == requester_user.id,
-            )
+        get_tender_organization_query = select(Tender.organization_id).where(
+            Tender.id == tender_id
         )
-        requester_user_tender = await session.execute(get_requester_user_tender_query)
+        tender_organization_id = await session.execute(get_tender_organization_query)
+        tender_organization_id = tender_organization_id.scalar_one_or_none()
 
-        try:
-            requester_user_tender = requester_user_tender.scalar_one()
-        except NoResultFound:
+        if not await membership_index.is_responsible(
+            session, requester_user.id, tender_organization_id
+        ):
             raise HTTPException(
                 status_code=403,
                 detail="Нет прав на получение данных",
             )
 
-        bid_reviews_query = (
-            select(BidReview)
-            .select_from(BidReview)
-            .join(
-                Bid,
-                BidReview.bid_id == Bid.id,
-            )
-            .where(
-                Bid.tender_id == tender_id,
-                Bid.author_id == author_user.id,
-            )
-            .limit(limit)
-            .offset(offset)
+        query = paginate(
+            bid_reviews_query(tender_id, author_user.id),
+            BID_REVIEW_KEYSET,
+            limit,
+            offset,
+            cursor,
         )
 
-        bid_reviews = await session.execute(bid_reviews_query)
+        bid_reviews = await session.execute(query)
+        bid_reviews = bid_reviews.all()
+        set_next_cursor(response, bid_reviews, BID_REVIEW_KEYSET, limit)
 
-        return bid_reviews.scalars().all()
+        return serialize_list(BID_REVIEW_LIST, bid_reviews, response)
@@ -0,0 +1,128 @@
+import json
+import uuid
+from typing import Any, Iterable, Sequence, TypeVar
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, TableClause, column, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: uuid.UUID | None = None
+    error: str | None = None
+
+
+def _check_size(items: Sequence[Any]) -> None:
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Не больше {settings.BULK_MAX_ITEMS} элементов за запрос",
+        )
+
+
+async def read_items(request: Request) -> list[Any]:
+    """
+    Прочитать элементы пакета из JSON-массива или NDJSON.
+
+    NDJSON разбирается по мере чтения тела. Строка, которая не является
+    JSON, остаётся в списке как есть и не пройдёт валидацию схемы.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_MEDIA_TYPES:
+        items = []
+        buffer = b""
+        async for chunk in request.stream():
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            items.extend(_parse_line(line) for line in lines if line.strip())
+            _check_size(items)
+        if buffer.strip():
+            items.append(_parse_line(buffer))
+        _check_size(items)
+        return items
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=400,
+            detail="Ожидается JSON-массив или NDJSON",
+        )
+    _check_size(items)
+    return items
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode(errors="replace")
+
+
+def validate_items(
+    items: Iterable[Any],
+    schema: type[SchemaT],
+) -> tuple[list[tuple[int, SchemaT]], dict[int, BulkItemResult]]:
+    """
+    Провалидировать элементы пакета.
+
+    Возвращает корректные элементы с их позициями и ошибки для остальных.
+    """
+    valid = []
+    errors = {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as error:
+            errors[index] = BulkItemResult(
+                index=index,
+                error="Некорректные данные: "
+                + "; ".join(
+                    f"{'.'.join(map(str, detail['loc'])) or 'item'}: {detail['msg']}"
+                    for detail in error.errors()
+                ),
+            )
+    return valid, errors
+
+
+async def copy_to_staging(
+    session: AsyncSession,
+    target: Table,
+    columns: Sequence[str],
+    records: Iterable[Sequence[Any]],
+) -> TableClause:
+    """
+    Загрузить строки через COPY во временную таблицу той же структуры, что и target.
+
+    Временная таблица живёт столько же, сколько соединение пула, и
+    очищается при завершении транзакции. Переносить строки в target
+    нужно в той же транзакции через INSERT ... SELECT.
+    """
+    staging_name = f"{target.name}_staging"
+    connection = await session.connection()
+    await connection.exec_driver_sql(
+        f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging_name} "
+        f"(LIKE {target.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        staging_name,
+        records=records,
+        columns=list(columns),
+    )
+
+    return table(
+        staging_name,
+        *(column(name, target.c[name].type) for name in columns),
+    )
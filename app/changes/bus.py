@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable
+
+import asyncpg
+from sqlalchemy import make_url
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "change_outbox"
+
+# Событие RESET означает, что часть изменений могла быть пропущена
+# (например, пока не было соединения), и подписчик должен сбросить всё.
+RESET = "RESET"
+
+FETCH_EVENTS = """
+SELECT topic, operation, entity_id, payload, previous
+FROM change_outbox
+WHERE id BETWEEN $1 AND $2 AND transaction_id = $3
+ORDER BY id
+"""
+
+PRUNE_EVENTS = """
+DELETE FROM change_outbox
+WHERE created_at < current_timestamp - make_interval(secs => $1)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeEvent:
+    topic: str
+    operation: str
+    entity_id: uuid.UUID | None = None
+    payload: dict | None = None
+    previous: dict | None = None
+
+
+ChangeHandler = Callable[[ChangeEvent], None]
+
+
+def _load_json(value: str | None) -> dict | None:
+    return json.loads(value) if value is not None else None
+
+
+class ChangeBus:
+    """
+    Шина изменений между воркерами поверх change_outbox и LISTEN/NOTIFY.
+
+    Отдельное соединение asyncpg слушает канал change_outbox. Уведомление
+    содержит только диапазон id и номер транзакции, сами события читаются
+    из таблицы и по порядку передаются подписчикам темы (имени таблицы).
+    После переподключения всем подписчикам отправляется RESET.
+    """
+
+    def __init__(self, retention: float, prune_interval: float):
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self._handlers: dict[str, list[ChangeHandler]] = defaultdict(list)
+        self._notifications: asyncio.Queue[str] = asyncio.Queue()
+        self._connection: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+        self.notifications = 0
+        self.events = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.delivery_time_max = 0.0
+
+    def subscribe(self, topic: str, handler: ChangeHandler) -> Callable[[], None]:
+        """
+        Подписаться на изменения таблицы topic, возвращает функцию отписки.
+        """
+        self._handlers[topic].append(handler)
+        return lambda: self._handlers[topic].remove(handler)
+
+    def publish(self, event: ChangeEvent) -> None:
+        for handler in list(self._handlers.get(event.topic, ())):
+            try:
+                handler(event)
+            except Exception:
+                self.errors += 1
+                logger.exception("Ошибка обработчика изменений %s", event.topic)
+
+    def reset(self) -> None:
+        for topic in list(self._handlers):
+            self.publish(ChangeEvent(topic=topic, operation=RESET))
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        self.notifications += 1
+        self._notifications.put_nowait(payload)
+
+    async def _connect(self) -> asyncpg.Connection:
+        url = make_url(settings.POSTGRES_CONN).set(drivername="postgresql")
+        connection = await asyncpg.connect(url.render_as_string(hide_password=False))
+        await connection.add_listener(CHANNEL, self._on_notification)
+        return connection
+
+    async def _deliver(self, connection: asyncpg.Connection, payload: str) -> None:
+        started = time.perf_counter()
+        bounds = json.loads(payload)
+        rows = await connection.fetch(
+            FETCH_EVENTS,
+            bounds["first"],
+            bounds["last"],
+            bounds["transaction"],
+        )
+        for row in rows:
+            self.events += 1
+            self.publish(
+                ChangeEvent(
+                    topic=row["topic"],
+                    operation=row["operation"],
+                    entity_id=row["entity_id"],
+                    payload=_load_json(row["payload"]),
+                    previous=_load_json(row["previous"]),
+                )
+            )
+        self.delivery_time_max = max(
+            self.delivery_time_max, time.perf_counter() - started
+        )
+
+    async def _consume(self, connection: asyncpg.Connection) -> None:
+        pruned_at = time.monotonic()
+        while not connection.is_closed():
+            try:
+                payload = await asyncio.wait_for(self._notifications.get(), 1.0)
+            except asyncio.TimeoutError:
+                payload = None
+            if payload is not None:
+                await self._deliver(connection, payload)
+
+            if time.monotonic() - pruned_at >= self.prune_interval:
+                await connection.execute(PRUNE_EVENTS, self.retention)
+                pruned_at = time.monotonic()
+
+    async def _run(self) -> None:
+        connected_before = False
+        while True:
+            try:
+                self._connection = await self._connect()
+            except Exception:
+                logger.exception("Не удалось подключиться к шине изменений")
+                await asyncio.sleep(1.0)
+                continue
+
+            if connected_before:
+                self.reconnects += 1
+                self.reset()
+            connected_before = True
+
+            try:
+                await self._consume(self._connection)
+            except Exception:
+                logger.exception("Соединение шины изменений потеряно")
+            finally:
+                self._connection.terminate()
+                self._connection = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "connected": self._connection is not None,
+            "subscribers": sum(len(handlers) for handlers in self._handlers.values()),
+            "notifications": self.notifications,
+            "events": self.events,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "delivery_time_max": self.delivery_time_max,
+        }
+
+
+change_bus = ChangeBus(
+    retention=settings.CHANGE_OUTBOX_RETENTION,
+    prune_interval=settings.CHANGE_OUTBOX_PRUNE_INTERVAL,
+)
@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import BigInteger, String, TIMESTAMP, func, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import Base
+
+
+class ChangeOutbox(Base):
+    """
+    Журнал изменений tender, bid, organization_responsible и employee.
+
+    Строки пишут триггеры в той же транзакции, что и само изменение, и
+    после фиксации транзакции рассылают pg_notify с диапазоном id.
+    В payload и previous лежат не строки целиком, а только id, версия,
+    статус и ключи, которые читают подписчики шины.
+    """
+
+    __tablename__ = "change_outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    transaction_id: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("txid_current()")
+    )
+    topic: Mapped[str] = mapped_column(String(50))
+    operation: Mapped[str] = mapped_column(String(10))
+    entity_id: Mapped[uuid.UUID]
+    payload: Mapped[dict | None] = mapped_column(JSONB)
+    previous: Mapped[dict | None] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, server_default=func.current_timestamp()
+    )
+
+    __table_args__ = (Index("ix_change_outbox_created_at", "created_at"),)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable
+
+from app.changes.bus import RESET, ChangeEvent, change_bus
+from app.config import settings
+
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+class ChangeStreams:
+    """
+    Раздача событий одной темы шины изменений клиентским очередям.
+
+    На тему воркер держит одну подписку на change_bus, события
+    раскладываются по очередям клиентов, открытых на entity_id. Если
+    клиент не успевает читать, его очередь заменяется одним RESET, и
+    клиент перечитывает состояние целиком.
+    """
+
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.queue_size = queue_size
+        self._queues: dict[uuid.UUID, set[asyncio.Queue]] = defaultdict(set)
+        self._subscribed = False
+
+    def open(self, entity_id: uuid.UUID) -> asyncio.Queue[ChangeEvent]:
+        if not self._subscribed:
+            change_bus.subscribe(self.topic, self._dispatch)
+            self._subscribed = True
+
+        queue = asyncio.Queue(self.queue_size)
+        self._queues[entity_id].add(queue)
+        return queue
+
+    def close(self, entity_id: uuid.UUID, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(entity_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._queues[entity_id]
+
+    def _dispatch(self, event: ChangeEvent) -> None:
+        if event.operation == RESET:
+            targets = [queue for queues in self._queues.values() for queue in queues]
+        else:
+            targets = self._queues.get(event.entity_id, ())
+
+        for queue in targets:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(ChangeEvent(topic=self.topic, operation=RESET))
+
+    def stats(self) -> dict:
+        return {
+            "entities": len(self._queues),
+            "clients": sum(len(queues) for queues in self._queues.values()),
+        }
+
+
+tender_streams = ChangeStreams("tender", settings.SSE_QUEUE_SIZE)
+bid_streams = ChangeStreams("bid", settings.SSE_QUEUE_SIZE)
+
+
+def sse_message(event: str, data: dict) -> str:
+    return f"id: {data['version']}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def status_events(
+    streams: ChangeStreams,
+    entity_id: uuid.UUID,
+    load_state: Callable[[], Awaitable[dict | None]],
+    next_state: Callable[[ChangeEvent], Awaitable[dict | None]],
+) -> AsyncIterator[str]:
+    """
+    Поток событий status со статусом и версией сущности.
+
+    Подписка открывается до чтения текущего состояния, поэтому изменения
+    между чтением и подпиской не теряются, а устаревшие события (с версией
+    не новее отправленной) пропускаются. load_state читает состояние из
+    БД, next_state строит его по событию; None из любой из них закрывает
+    поток (сущность удалена или больше не доступна). В паузах
+    отправляются комментарии heartbeat.
+    """
+    queue = streams.open(entity_id)
+    try:
+        state = await load_state()
+        if state is None:
+            return
+        yield sse_message("status", state)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), settings.SSE_HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+
+            if event.operation == RESET:
+                new_state = await load_state()
+            else:
+                new_state = await next_state(event)
+            if new_state is None:
+                return
+            if new_state["version"] > state["version"]:
+                state = new_state
+                yield sse_message("status", state)
+    finally:
+        streams.close(entity_id, queue)
@@ -0,0 +1,58 @@
+from sqlalchemy import ColumnElement, true
+
+
+def version_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Совпадает ли ETag с одним из значений If-None-Match (слабое сравнение).
+    """
+    if if_none_match is None:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def if_match_versions(if_match: str | None) -> set[int] | None:
+    """
+    Версии, перечисленные в If-Match.
+
+    None означает, что условия нет: заголовок не передан или равен "*".
+    Слабые и чужие ETag не совпадают ни с одной версией.
+    """
+    if if_match is None:
+        return None
+
+    versions = set()
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return None
+        if (
+            len(candidate) > 2
+            and candidate[0] == candidate[-1] == '"'
+            and candidate[1:-1].isdigit()
+        ):
+            versions.add(int(candidate[1:-1]))
+    return versions
+
+
+def version_matches(version: int, if_match: str | None) -> bool:
+    versions = if_match_versions(if_match)
+    return versions is None or version in versions
+
+
+def version_condition(
+    column: ColumnElement[int],
+    if_match: str | None,
+) -> ColumnElement[bool]:
+    """
+    Условие compare-and-swap для UPDATE: строка меняется, только если её
+    версия всё ещё одна из перечисленных в If-Match.
+    """
+    versions = if_match_versions(if_match)
+    if versions is None:
+        return true()
+    return column.in_(versions)
@@ -1,8 +1,14 @@
+from typing import Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     SERVER_ADDRESS: str
+    SERVER_WORKERS: int = 0
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_ACCESS_LOG: bool = False
     POSTGRES_USERNAME: str
     POSTGRES_PASSWORD: str
     POSTGRES_HOST: str
@@ -12,9 +18,48 @@ class Settings(BaseSettings):
     POSTGRES_JDBC_URL: str
     POSTGRES_CONN: str
 
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 30.0
+    POSTGRES_POOL_RECYCLE: int = -1
+    POSTGRES_POOL_PRE_PING: bool = False
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 100
+    POSTGRES_POOL_WARM: int = 0
+
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL: float = 300.0
+
+    VERSION_SNAPSHOT_INTERVAL: int = 10
+    VERSION_WRITE_BEHIND: bool = False
+    VERSION_FLUSH_INTERVAL_MS: int = 50
+    VERSION_FLUSH_BATCH_SIZE: int = 500
+    VERSION_HISTORY_SYNCHRONOUS_COMMIT: bool = True
+
+    BULK_MAX_ITEMS: int = 10_000
+    EXPORT_BATCH_SIZE: int = 1000
+
+    RESPONSE_SERIALIZER: Literal["default", "adapter", "orjson"] = "default"
+
+    TENDER_PAGE_CACHE_SIZE: int = 1024
+    TENDER_PAGE_CACHE_TTL: float = 30.0
+    TENDER_PAGE_MAX_AGE: int = 0
+
+    CHANGE_BUS_ENABLED: bool = True
+    CHANGE_OUTBOX_RETENTION: float = 3600.0
+    CHANGE_OUTBOX_PRUNE_INTERVAL: float = 60.0
+
+    SSE_HEARTBEAT_INTERVAL: float = 15.0
+    SSE_QUEUE_SIZE: int = 64
+
     model_config = SettingsConfigDict(env_file=".env")
 
+    @model_validator(mode="after")
+    def check_write_behind_workers(self) -> "Settings":
+        # Очередь write-behind живёт в памяти процесса, и откат к версии
+        # дописывает только свою очередь: режим рассчитан на один процесс.
+        if self.VERSION_WRITE_BEHIND and self.SERVER_WORKERS != 1:
+            raise ValueError("VERSION_WRITE_BEHIND требует SERVER_WORKERS=1")
+        return self
 
-settings = Settings()
 
-print(settings.POSTGRES_CONN)
+settings = Settings()
@@ -1,14 +1,105 @@
+import time
+
+from sqlalchemy import exc
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
 from app.config import settings
 
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который считает ожидания и таймауты при checkout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait_time = time.perf_counter() - started_at
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout": self.timeout(),
+            "checkouts": self.checkouts,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_max": self.wait_time_max,
+            "timeouts": self.timeouts,
+        }
+
+
 # DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_async_engine(settings.POSTGRES_CONN)
-async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+_engine: AsyncEngine | None = None
+_session_maker: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Движок создаётся при первом обращении, а не при импорте модуля.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.POSTGRES_CONN,
+            poolclass=InstrumentedPool,
+            pool_size=settings.POSTGRES_POOL_SIZE,
+            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+            pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+            pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+            pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+            # Диалект asyncpg готовит запросы через connection.prepare() и
+            # держит свой LRU-кэш на соединение; statement_cache_size самого
+            # asyncpg на эти запросы не влияет.
+            connect_args={
+                "prepared_statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE
+            },
+        )
+    return _engine
+
+
+def async_session_maker() -> AsyncSession:
+    """
+    Новая сессия на движке get_engine().
+    """
+    global _session_maker
+    if _session_maker is None:
+        _session_maker = async_sessionmaker(bind=get_engine(), expire_on_commit=False)
+    return _session_maker()
+
+
+async def dispose_engine() -> None:
+    """
+    Закрыть пул соединений; следующее обращение создаст движок заново.
+    """
+    global _engine, _session_maker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = _session_maker = None
 
 
 class Base(DeclarativeBase):
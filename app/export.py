@@ -0,0 +1,75 @@
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app.config import settings
+from app.database import async_session_maker
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def _render(rows: list[BaseModel], export_format: ExportFormat) -> str:
+    if export_format == ExportFormat.ndjson:
+        return "".join(row.model_dump_json() + "\n" for row in rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(row.model_dump(mode="json").values() for row in rows)
+    return buffer.getvalue()
+
+
+async def _stream(
+    query: Select,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+) -> AsyncIterator[str]:
+    if export_format == ExportFormat.csv:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(schema.model_fields)
+        yield buffer.getvalue()
+
+    async with async_session_maker() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for partition in result.scalars().partitions():
+            rows = [
+                schema.model_validate(row, from_attributes=True)
+                for row in partition
+                if row is not None
+            ]
+            if rows:
+                yield _render(rows, export_format)
+
+
+def export_response(
+    query: Select,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+) -> StreamingResponse:
+    """
+    Отдать результат запроса потоком NDJSON или CSV.
+
+    Строки читаются серверным курсором пачками по EXPORT_BATCH_SIZE, и
+    следующая пачка запрашивается только после того, как предыдущая
+    отправлена клиенту, поэтому память не растёт с размером выгрузки.
+    Запрос должен возвращать ORM-объекты одной сущности в первом столбце.
+    """
+    return StreamingResponse(
+        _stream(query, schema, export_format),
+        media_type=MEDIA_TYPES[export_format],
+    )
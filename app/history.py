@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from sqlalchemy import insert, text
+
+from app.config import settings
+from app.database import Base, async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """
+    Отложенная запись строк истории версий (write-behind).
+
+    Строки истории зафиксированных транзакций складываются в очередь в
+    памяти процесса, а фоновая задача записывает их многострочными INSERT
+    раз в interval секунд или сразу, как только набралось batch_size строк.
+
+    Строки, не успевшие попасть в базу, теряются при аварийной остановке
+    процесса; при штатной остановке очередь дописывается в stop().
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        batch_size: int,
+        synchronous_commit: bool = True,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.synchronous_commit = synchronous_commit
+        self._queue: deque[tuple[type[Base], dict]] = deque()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.enqueued = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.flush_time_total = 0.0
+        self.flush_time_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def put(self, rows: list[tuple[type[Base], dict]]) -> None:
+        self._queue.extend(rows)
+        self.enqueued += len(rows)
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """
+        Записать всё, что сейчас есть в очереди.
+
+        При ошибке строки возвращаются в начало очереди.
+        """
+        async with self._lock:
+            while self._queue:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                started = time.perf_counter()
+                try:
+                    await self._write(batch)
+                except Exception:
+                    self._queue.extendleft(reversed(batch))
+                    self.failures += 1
+                    raise
+
+                elapsed = time.perf_counter() - started
+                self.flushed += len(batch)
+                self.flushes += 1
+                self.flush_time_total += elapsed
+                self.flush_time_max = max(self.flush_time_max, elapsed)
+
+    async def _write(self, batch: list[tuple[type[Base], dict]]) -> None:
+        by_model: dict[type[Base], list[dict]] = {}
+        for version_model, values in batch:
+            by_model.setdefault(version_model, []).append(values)
+
+        async with async_session_maker() as session:
+            if not self.synchronous_commit:
+                await session.execute(text("SET LOCAL synchronous_commit TO OFF"))
+            for version_model, rows in by_model.items():
+                await session.execute(insert(version_model), rows)
+            await session.commit()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Не удалось записать историю версий")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.VERSION_WRITE_BEHIND,
+            "depth": len(self._queue),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "flush_time_total": self.flush_time_total,
+            "flush_time_max": self.flush_time_max,
+        }
+
+
+history_writer = HistoryWriter(
+    interval=settings.VERSION_FLUSH_INTERVAL_MS / 1000,
+    batch_size=settings.VERSION_FLUSH_BATCH_SIZE,
+    synchronous_commit=settings.VERSION_HISTORY_SYNCHRONOUS_COMMIT,
+)
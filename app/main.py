@@ -1,18 +1,58 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import RedirectResponse
 
 from app.bid.routers import router as bid_router
 from app.user.routers import router as user_router
 from app.tender.routers import router as tender_router
 from app.organization.routers import router as organization_router
+from app.monitoring.routers import router as monitoring_router
+from app.config import settings
+from app.database import async_session_maker, dispose_engine, get_engine
+from app.organization.membership import membership_index
+from app.warmup import warm_up
+from app.history import history_writer
+from app.changes.bus import change_bus
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+
+    # Соединения, подготовленные запросы и индекс ответственных готовятся
+    # до того, как /ping сообщит о готовности.
+    await warm_up(
+        get_engine(),
+        min(
+            settings.POSTGRES_POOL_WARM or settings.POSTGRES_POOL_SIZE,
+            settings.POSTGRES_POOL_SIZE,
+        ),
+    )
+    async with async_session_maker() as session:
+        await membership_index.ensure_loaded(session)
 
+    if settings.VERSION_WRITE_BEHIND:
+        history_writer.start()
+    if settings.CHANGE_BUS_ENABLED:
+        change_bus.start()
 
-app = FastAPI(title="Avito2024", root_path="/api")
+    app.state.ready = True
+    yield
+    app.state.ready = False
+
+    await change_bus.stop()
+    await history_writer.stop()
+    await dispose_engine()
+
+
+app = FastAPI(title="Avito2024", root_path="/api", lifespan=lifespan)
 
 app.include_router(user_router)
 app.include_router(organization_router)
 app.include_router(tender_router)
 app.include_router(bid_router)
+app.include_router(monitoring_router)
 
 
 @app.get("/", include_in_schema=False)
@@ -21,10 +61,17 @@ def index():
 
 
 @app.get("/ping")
-def ping() -> str:
+def ping(request: Request) -> str:
     """
     Этот эндпоинт используется для проверки готовности сервера обрабатывать запросы.
 
     Чекер программа будет ждать первый успешный ответ и затем начнет выполнение тестовых сценариев.
+
+    Пока идёт прогрев при запуске или остановка, возвращается 503.
     """
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(
+            status_code=503,
+            detail="Сервер ещё не готов",
+        )
     return "ok"
@@ -11,6 +11,7 @@ from app.tender.models import Tender, TenderVersion
 from app.bid.models import Bid, BidVersion, BidReview, BidDecision
 from app.organization.models import Organization, OrganizationResponsible
 from app.user.models import User
+from app.changes.models import ChangeOutbox
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
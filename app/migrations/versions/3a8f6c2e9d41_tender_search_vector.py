@@ -0,0 +1,56 @@
+"""Tender search vector
+
+Revision ID: 3a8f6c2e9d41
+Revises: 9c3e7a1d5b20
+Create Date: 2026-10-17 15:02:17.530912
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3a8f6c2e9d41"
+down_revision: Union[str, None] = "9c3e7a1d5b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Добавление STORED-столбца переписывает таблицу tender целиком.
+    op.add_column(
+        "tender",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tender_search_vector",
+            "tender",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tender_search_vector",
+            table_name="tender",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("tender", "search_vector")
@@ -0,0 +1,107 @@
+"""Performance indexes
+
+Revision ID: 5f0d04fa884b
+Revises: dbc1421aad3c
+Create Date: 2026-10-17 10:12:41.402291
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5f0d04fa884b"
+down_revision: Union[str, None] = "dbc1421aad3c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    (
+        "ix_tender_status_service_type_name",
+        "tender",
+        ["status", "service_type", "name"],
+        None,
+    ),
+    ("ix_tender_published_name", "tender", ["name", "id"], "status = 'Published'"),
+    (
+        "ix_tender_published_service_type_name",
+        "tender",
+        ["service_type", "name", "id"],
+        "status = 'Published'",
+    ),
+    (
+        "ix_tender_organization_id_name",
+        "tender",
+        ["organization_id", "name", "id"],
+        None,
+    ),
+    (
+        "ix_tender_creator_username_name",
+        "tender",
+        ["creator_username", "name", "id"],
+        None,
+    ),
+    ("ix_bid_tender_id_status", "bid", ["tender_id", "status"], None),
+    (
+        "ix_bid_published_tender_id",
+        "bid",
+        ["tender_id", "name", "id"],
+        "status = 'Published'",
+    ),
+    ("ix_bid_author_id_name", "bid", ["author_id", "name", "id"], None),
+    ("ix_bid_responsible_bid_id", "bid_responsible", ["bid_id"], None),
+    (
+        "ix_organization_responsible_user_id_organization_id",
+        "organization_responsible",
+        ["user_id", "organization_id"],
+        None,
+    ),
+    (
+        "ix_organization_responsible_organization_id",
+        "organization_responsible",
+        ["organization_id"],
+        None,
+    ),
+    ("ix_bid_version_bid_id_version", "bid_version", ["bid_id", "version"], None),
+    (
+        "ix_tender_version_tender_id_version",
+        "tender_version",
+        ["tender_id", "version"],
+        None,
+    ),
+    ("ix_bid_decision_bid_id", "bid_decision", ["bid_id"], None),
+    (
+        "ix_bid_review_bid_id_created_at",
+        "bid_review",
+        ["bid_id", "created_at", "id"],
+        None,
+    ),
+]
+
+
+def upgrade() -> None:
+    # Индексы строятся CONCURRENTLY, чтобы не блокировать запись в рабочие таблицы.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,47 @@
+"""Bid decision tally
+
+Revision ID: 7d2b9e4f1c63
+Revises: 3a8f6c2e9d41
+Create Date: 2026-10-17 17:41:08.215634
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2b9e4f1c63"
+down_revision: Union[str, None] = "3a8f6c2e9d41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bid_decision_tally",
+        sa.Column("bid_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "approved", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column(
+            "rejected", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["bid_id"], ["bid.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("bid_id"),
+    )
+    # Счётчики уже принятых решений.
+    op.execute("""
+        INSERT INTO bid_decision_tally (bid_id, approved, rejected)
+        SELECT
+            bid_id,
+            count(*) FILTER (WHERE decision = 'Approved'),
+            count(*) FILTER (WHERE decision = 'Rejected')
+        FROM bid_decision
+        GROUP BY bid_id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("bid_decision_tally")
@@ -0,0 +1,99 @@
+"""Delta version history
+
+Revision ID: 9c3e7a1d5b20
+Revises: 5f0d04fa884b
+Create Date: 2026-10-17 13:40:05.118734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3e7a1d5b20"
+down_revision: Union[str, None] = "5f0d04fa884b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Интервал снимков для уже накопленной истории. Чтение его не использует:
+# версия восстанавливается от ближайшего снимка, где бы он ни стоял.
+SNAPSHOT_INTERVAL = 10
+
+HISTORY = {
+    "tender_version": (
+        "tender_id",
+        [
+            "name",
+            "description",
+            "service_type",
+            "status",
+            "organization_id",
+            "creator_username",
+        ],
+    ),
+    "bid_version": (
+        "bid_id",
+        ["name", "description", "status", "author_type", "author_id", "tender_id"],
+    ),
+}
+
+
+def upgrade() -> None:
+    for table, (owner, fields) in HISTORY.items():
+        op.add_column(
+            table,
+            sa.Column(
+                "is_snapshot",
+                sa.Boolean(),
+                server_default=sa.true(),
+                nullable=False,
+            ),
+        )
+        for field in fields:
+            op.alter_column(table, field, nullable=True)
+
+        # Каждая SNAPSHOT_INTERVAL-я строка истории остаётся полной копией,
+        # в остальных обнуляются поля, совпадающие с предыдущей версией.
+        # Все значения LAG вычисляются по исходным строкам до обновления.
+        lags = ", ".join(f"lag({field}) OVER w AS previous_{field}" for field in fields)
+        assignments = ", ".join(
+            f"{field} = CASE WHEN {table}.{field} IS DISTINCT FROM "
+            f"history.previous_{field} THEN {table}.{field} END"
+            for field in fields
+        )
+        op.execute(f"""
+            UPDATE {table}
+            SET is_snapshot = false, {assignments}
+            FROM (
+                SELECT id, row_number() OVER w AS position, {lags}
+                FROM {table}
+                WINDOW w AS (PARTITION BY {owner} ORDER BY version, created_at)
+            ) AS history
+            WHERE {table}.id = history.id
+              AND (history.position - 1) % {SNAPSHOT_INTERVAL} <> 0
+            """)
+
+
+def downgrade() -> None:
+    for table, (owner, fields) in HISTORY.items():
+        # Пропуски в дельтах заполняются последним известным значением.
+        for field in fields:
+            op.execute(f"""
+                UPDATE {table}
+                SET {field} = (
+                    SELECT earlier.{field}
+                    FROM {table} AS earlier
+                    WHERE earlier.{owner} = {table}.{owner}
+                      AND earlier.version < {table}.version
+                      AND earlier.{field} IS NOT NULL
+                    ORDER BY earlier.version DESC
+                    LIMIT 1
+                )
+                WHERE {field} IS NULL
+                """)
+        for field in fields:
+            op.alter_column(table, field, nullable=False)
+        op.drop_column(table, "is_snapshot")
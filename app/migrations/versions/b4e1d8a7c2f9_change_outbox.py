@@ -0,0 +1,132 @@
+"""Change outbox
+
+Revision ID: b4e1d8a7c2f9
+Revises: 7d2b9e4f1c63
+Create Date: 2026-10-17 19:20:44.903517
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e1d8a7c2f9"
+down_revision: Union[str, None] = "7d2b9e4f1c63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CAPTURED_TABLES = ["tender", "bid", "organization_responsible", "employee"]
+
+# Триггер уровня оператора пишет по строке журнала на каждую изменённую
+# строку таблицы и одним pg_notify сообщает диапазон их id. Уведомление
+# доставляется слушателям только после фиксации транзакции.
+CAPTURE_FUNCTION = """
+CREATE FUNCTION change_outbox_capture() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    bounds record;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        WITH captured AS (
+            INSERT INTO change_outbox (topic, operation, entity_id, payload)
+            SELECT TG_TABLE_NAME, TG_OP, n.id, to_jsonb(n) - 'search_vector'
+            FROM new_rows n
+            RETURNING id
+        )
+        SELECT min(id) AS first, max(id) AS last INTO bounds FROM captured;
+    ELSIF TG_OP = 'UPDATE' THEN
+        WITH captured AS (
+            INSERT INTO change_outbox (topic, operation, entity_id, payload, previous)
+            SELECT
+                TG_TABLE_NAME,
+                TG_OP,
+                n.id,
+                to_jsonb(n) - 'search_vector',
+                to_jsonb(o) - 'search_vector'
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            RETURNING id
+        )
+        SELECT min(id) AS first, max(id) AS last INTO bounds FROM captured;
+    ELSE
+        WITH captured AS (
+            INSERT INTO change_outbox (topic, operation, entity_id, previous)
+            SELECT TG_TABLE_NAME, TG_OP, o.id, to_jsonb(o) - 'search_vector'
+            FROM old_rows o
+            RETURNING id
+        )
+        SELECT min(id) AS first, max(id) AS last INTO bounds FROM captured;
+    END IF;
+
+    IF bounds.last IS NOT NULL THEN
+        PERFORM pg_notify(
+            'change_outbox',
+            json_build_object(
+                'first', bounds.first,
+                'last', bounds.last,
+                'transaction', txid_current()
+            )::text
+        );
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Таблицы переходов можно объявить только у триггера на одно событие.
+TRIGGERS = {
+    "insert": ("INSERT", "NEW TABLE AS new_rows"),
+    "update": ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    "delete": ("DELETE", "OLD TABLE AS old_rows"),
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_outbox",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "transaction_id",
+            sa.BigInteger(),
+            server_default=sa.text("txid_current()"),
+            nullable=False,
+        ),
+        sa.Column("topic", sa.String(length=50), nullable=False),
+        sa.Column("operation", sa.String(length=10), nullable=False),
+        sa.Column("entity_id", sa.Uuid(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("previous", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_change_outbox_created_at", "change_outbox", ["created_at"], unique=False
+    )
+
+    op.execute(CAPTURE_FUNCTION)
+    for table in CAPTURED_TABLES:
+        for suffix, (event, transition) in TRIGGERS.items():
+            op.execute(
+                f"CREATE TRIGGER {table}_change_outbox_{suffix} "
+                f"AFTER {event} ON {table} "
+                f"REFERENCING {transition} "
+                "FOR EACH STATEMENT EXECUTE FUNCTION change_outbox_capture()"
+            )
+
+
+def downgrade() -> None:
+    for table in reversed(CAPTURED_TABLES):
+        for suffix in TRIGGERS:
+            op.execute(f"DROP TRIGGER {table}_change_outbox_{suffix} ON {table}")
+    op.execute("DROP FUNCTION change_outbox_capture()")
+    op.drop_index("ix_change_outbox_created_at", table_name="change_outbox")
+    op.drop_table("change_outbox")
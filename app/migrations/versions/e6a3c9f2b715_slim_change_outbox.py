@@ -0,0 +1,132 @@
+"""Slim change outbox
+
+Revision ID: e6a3c9f2b715
+Revises: b4e1d8a7c2f9
+Create Date: 2026-10-17 21:05:12.418230
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a3c9f2b715"
+down_revision: Union[str, None] = "b4e1d8a7c2f9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# В журнал попадают только поля, которые читают подписчики шины:
+# id, версия, статус и ключи для инвалидации и проверки доступа.
+CAPTURED_COLUMNS = {
+    "tender": ["id", "version", "status", "service_type", "organization_id"],
+    "bid": ["id", "version", "status", "tender_id", "author_type", "author_id"],
+    "organization_responsible": ["id", "user_id", "organization_id"],
+    "employee": ["id", "username"],
+}
+
+# Список полей передаётся аргументами триггера. Без аргументов строка
+# пишется целиком, как в b4e1d8a7c2f9.
+CAPTURE_FUNCTION = """
+CREATE OR REPLACE FUNCTION change_outbox_capture() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    bounds record;
+    columns text[] := TG_ARGV;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        WITH captured AS (
+            INSERT INTO change_outbox (topic, operation, entity_id, payload)
+            SELECT TG_TABLE_NAME, TG_OP, n.id, change_outbox_row(to_jsonb(n), columns)
+            FROM new_rows n
+            RETURNING id
+        )
+        SELECT min(id) AS first, max(id) AS last INTO bounds FROM captured;
+    ELSIF TG_OP = 'UPDATE' THEN
+        WITH captured AS (
+            INSERT INTO change_outbox (topic, operation, entity_id, payload, previous)
+            SELECT
+                TG_TABLE_NAME,
+                TG_OP,
+                n.id,
+                change_outbox_row(to_jsonb(n), columns),
+                change_outbox_row(to_jsonb(o), columns)
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            RETURNING id
+        )
+        SELECT min(id) AS first, max(id) AS last INTO bounds FROM captured;
+    ELSE
+        WITH captured AS (
+            INSERT INTO change_outbox (topic, operation, entity_id, previous)
+            SELECT TG_TABLE_NAME, TG_OP, o.id, change_outbox_row(to_jsonb(o), columns)
+            FROM old_rows o
+            RETURNING id
+        )
+        SELECT min(id) AS first, max(id) AS last INTO bounds FROM captured;
+    END IF;
+
+    IF bounds.last IS NOT NULL THEN
+        PERFORM pg_notify(
+            'change_outbox',
+            json_build_object(
+                'first', bounds.first,
+                'last', bounds.last,
+                'transaction', txid_current()
+            )::text
+        );
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+ROW_FUNCTION = """
+CREATE FUNCTION change_outbox_row(row_data jsonb, columns text[]) RETURNS jsonb
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN cardinality(columns) = 0 THEN row_data - 'search_vector'
+        ELSE (
+            SELECT jsonb_object_agg(key, value)
+            FROM jsonb_each(row_data)
+            WHERE key = ANY(columns)
+        )
+    END
+$$
+"""
+
+PREVIOUS_CAPTURE_FUNCTION = CAPTURE_FUNCTION.replace(
+    "change_outbox_row(to_jsonb(n), columns)", "to_jsonb(n) - 'search_vector'"
+).replace("change_outbox_row(to_jsonb(o), columns)", "to_jsonb(o) - 'search_vector'")
+
+TRIGGERS = {
+    "insert": ("INSERT", "NEW TABLE AS new_rows"),
+    "update": ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    "delete": ("DELETE", "OLD TABLE AS old_rows"),
+}
+
+
+def create_triggers(captured_columns: dict[str, list[str]]) -> None:
+    for table, columns in captured_columns.items():
+        arguments = ", ".join(f"'{column}'" for column in columns)
+        for suffix, (event, transition) in TRIGGERS.items():
+            op.execute(f"DROP TRIGGER {table}_change_outbox_{suffix} ON {table}")
+            op.execute(
+                f"CREATE TRIGGER {table}_change_outbox_{suffix} "
+                f"AFTER {event} ON {table} "
+                f"REFERENCING {transition} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION change_outbox_capture({arguments})"
+            )
+
+
+def upgrade() -> None:
+    op.execute(ROW_FUNCTION)
+    op.execute(CAPTURE_FUNCTION)
+    create_triggers(CAPTURED_COLUMNS)
+
+
+def downgrade() -> None:
+    create_triggers({table: [] for table in CAPTURED_COLUMNS})
+    op.execute(PREVIOUS_CAPTURE_FUNCTION)
+    op.execute("DROP FUNCTION change_outbox_row(jsonb, text[])")
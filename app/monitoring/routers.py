@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+
+from app.database import get_engine
+from app.history import history_writer
+from app.changes.bus import change_bus
+from app.changes.streams import bid_streams, tender_streams
+from app.user.identity import identity_cache
+from app.organization.membership import membership_index
+from app.tender.cache import published_pages
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+@router.get("/stats", include_in_schema=False)
+async def stats() -> dict:
+    return {
+        "pool": get_engine().sync_engine.pool.stats(),
+        "identity_cache": identity_cache.stats(),
+        "membership_index": membership_index.stats(),
+        "published_pages": published_pages.stats(),
+        "history_writer": history_writer.stats(),
+        "change_bus": change_bus.stats(),
+        "tender_streams": tender_streams.stats(),
+        "bid_streams": bid_streams.stats(),
+    }
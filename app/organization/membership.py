@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from collections import Counter, defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.changes.bus import RESET, ChangeEvent, change_bus
+from app.organization.models import OrganizationResponsible
+
+
+class MembershipIndex:
+    """
+    Индекс ответственных за организации: user_id -> organization_id и обратно.
+
+    Загружается из таблицы organization_responsible один раз и дальше
+    поддерживается в актуальном состоянии при записи через API.
+
+    Уникальности пары (user_id, organization_id) в таблице нет, поэтому
+    индекс помнит строки по id: пара пропадает, только когда удалена
+    последняя её строка. Повторное добавление той же строки ничего не меняет.
+    """
+
+    def __init__(self):
+        self._organizations_by_user: dict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+        self._users_by_organization: dict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+        self._rows: dict[uuid.UUID, tuple[uuid.UUID, uuid.UUID]] = {}
+        self._row_counts: Counter[tuple[uuid.UUID, uuid.UUID]] = Counter()
+        self._loaded = False
+        # Увеличивается при каждом reset(): загрузка, во время которой
+        # индекс сбросили, не должна помечать его загруженным.
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self._loaded:
+            return
+
+        async with self._lock:
+            while not self._loaded:
+                generation = self._generation
+                query = select(
+                    OrganizationResponsible.id,
+                    OrganizationResponsible.user_id,
+                    OrganizationResponsible.organization_id,
+                )
+                rows = (await session.execute(query)).all()
+                if generation != self._generation:
+                    continue
+
+                for row_id, user_id, organization_id in rows:
+                    self.add(row_id, user_id, organization_id)
+                self._loaded = True
+
+    def add(
+        self,
+        row_id: uuid.UUID,
+        user_id: uuid.UUID,
+        organization_id: uuid.UUID,
+    ) -> None:
+        pair = (user_id, organization_id)
+        if self._rows.get(row_id) == pair:
+            return
+        self.discard(row_id)
+
+        self._rows[row_id] = pair
+        self._row_counts[pair] += 1
+        self._organizations_by_user[user_id].add(organization_id)
+        self._users_by_organization[organization_id].add(user_id)
+
+    def discard(self, row_id: uuid.UUID) -> None:
+        pair = self._rows.pop(row_id, None)
+        if pair is None:
+            return
+
+        self._row_counts[pair] -= 1
+        if self._row_counts[pair]:
+            return
+        del self._row_counts[pair]
+
+        user_id, organization_id = pair
+        self._organizations_by_user[user_id].discard(organization_id)
+        self._users_by_organization[organization_id].discard(user_id)
+
+    def reset(self) -> None:
+        self._organizations_by_user.clear()
+        self._users_by_organization.clear()
+        self._rows.clear()
+        self._row_counts.clear()
+        self._loaded = False
+        self._generation += 1
+
+    async def organizations(
+        self,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+    ) -> frozenset[uuid.UUID]:
+        await self.ensure_loaded(session)
+        return frozenset(self._organizations_by_user.get(user_id, ()))
+
+    async def responsibles(
+        self,
+        session: AsyncSession,
+        organization_id: uuid.UUID,
+    ) -> frozenset[uuid.UUID]:
+        await self.ensure_loaded(session)
+        return frozenset(self._users_by_organization.get(organization_id, ()))
+
+    async def is_responsible(
+        self,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+        organization_id: uuid.UUID | None,
+    ) -> bool:
+        if organization_id is None:
+            return False
+        await self.ensure_loaded(session)
+        return organization_id in self._organizations_by_user.get(user_id, ())
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "users": len(self._organizations_by_user),
+            "organizations": len(self._users_by_organization),
+        }
+
+
+membership_index = MembershipIndex()
+
+
+def _on_responsible_change(event: ChangeEvent) -> None:
+    if event.operation == RESET:
+        membership_index.reset()
+        return
+
+    if event.previous is not None:
+        membership_index.discard(uuid.UUID(event.previous["id"]))
+    if event.payload is not None:
+        membership_index.add(
+            uuid.UUID(event.payload["id"]),
+            uuid.UUID(event.payload["user_id"]),
+            uuid.UUID(event.payload["organization_id"]),
+        )
+
+
+change_bus.subscribe("organization_responsible", _on_responsible_change)
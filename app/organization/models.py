@@ -2,7 +2,8 @@ import uuid
 from enum import Enum
 from datetime import datetime
 from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import String, TIMESTAMP, func, TEXT, ForeignKey
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy import String, TIMESTAMP, func, TEXT, ForeignKey, Index
 
 from app.database import Base
 
@@ -17,9 +18,13 @@ class Organization(Base):
     __tablename__ = "organization"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[str] = mapped_column(TEXT())
-    organization_type: Mapped[OrganiztionType]
+    # Таблица создаётся вне миграций приложения: столбец называется type,
+    # а тип перечисления - organization_type.
+    organization_type: Mapped[OrganiztionType] = mapped_column(
+        "type", SAEnum(OrganiztionType, name="organization_type")
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=func.current_timestamp()
     )
@@ -40,3 +45,12 @@ class OrganizationResponsible(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("employee.id", ondelete="CASCADE"),
     )
+
+    __table_args__ = (
+        Index(
+            "ix_organization_responsible_user_id_organization_id",
+            "user_id",
+            "organization_id",
+        ),
+        Index("ix_organization_responsible_organization_id", "organization_id"),
+    )
@@ -3,6 +3,7 @@ from sqlalchemy import insert
 
 from app.database import async_session_maker
 from app.organization.models import Organization, OrganizationResponsible
+from app.organization.membership import membership_index
 from app.organization.schemas import OrganizationSchema, OrganizationResponsibleSchema
 
 router = APIRouter(prefix="/organizations", tags=["Organization"])
@@ -25,9 +26,19 @@ async def create_organization_responsible(
     organization_responsible: OrganizationResponsibleSchema,
 ):
     async with async_session_maker() as session:
-        query = insert(OrganizationResponsible).values(
-            organization_id=organization_responsible.organization_id,
-            user_id=organization_responsible.user_id,
+        query = (
+            insert(OrganizationResponsible)
+            .values(
+                organization_id=organization_responsible.organization_id,
+                user_id=organization_responsible.user_id,
+            )
+            .returning(OrganizationResponsible.id)
         )
-        await session.execute(query)
+        row_id = (await session.execute(query)).scalar_one()
         await session.commit()
+
+    membership_index.add(
+        row_id,
+        organization_responsible.user_id,
+        organization_responsible.organization_id,
+    )
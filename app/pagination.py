@@ -0,0 +1,105 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import ColumnElement, Select, literal, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        [str(value) if isinstance(value, uuid.UUID) else value for value in values],
+        default=lambda value: value.isoformat(),
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_value(column: InstrumentedAttribute, value: Any) -> Any:
+    """Привести значение из курсора к python-типу столбца keyset."""
+    python_type = column.type.python_type
+    if python_type is uuid.UUID:
+        if not isinstance(value, str):
+            raise TypeError
+        return uuid.UUID(value)
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise TypeError
+        return datetime.fromisoformat(value)
+    if python_type is float and isinstance(value, int):
+        value = float(value)
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        raise TypeError
+    return value
+
+
+def decode_cursor(
+    cursor: str,
+    keyset: Sequence[InstrumentedAttribute],
+) -> list[Any]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        raw_values = json.loads(payload)
+        if not isinstance(raw_values, list) or len(raw_values) != len(keyset):
+            raise ValueError
+
+        values = [
+            decode_value(column, value) for column, value in zip(keyset, raw_values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, AttributeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail="Некорректный курсор",
+        )
+
+    return values
+
+
+def keyset_after(
+    keyset: Sequence[InstrumentedAttribute],
+    cursor: str,
+) -> ColumnElement[bool]:
+    values = decode_cursor(cursor, keyset)
+    return tuple_(*keyset) > tuple_(
+        *(literal(value, column.type) for column, value in zip(keyset, values))
+    )
+
+
+def paginate(
+    query: Select,
+    keyset: Sequence[InstrumentedAttribute],
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> Select:
+    """
+    Упорядочить запрос по keyset и ограничить страницу.
+
+    Если передан курсор, страница начинается сразу после него и offset
+    игнорируется, иначе используется обычный offset.
+    """
+    query = query.order_by(*keyset).limit(limit)
+
+    if cursor is None:
+        return query.offset(offset)
+
+    return query.where(keyset_after(keyset, cursor))
+
+
+def set_next_cursor(
+    response: Response,
+    rows: Sequence[Any],
+    keyset: Sequence[InstrumentedAttribute],
+    limit: int,
+) -> None:
+    if limit and len(rows) == limit:
+        last_row = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last_row, column.key) for column in keyset]
+        )
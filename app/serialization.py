@@ -0,0 +1,78 @@
+from typing import Any, Sequence
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import settings
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def schema_columns(source: Any, schema: type[BaseModel]) -> list:
+    """
+    Столбцы, нужные схеме ответа, в порядке её полей.
+
+    source - модель, aliased-сущность или коллекция столбцов подзапроса
+    (subquery.c). Такой запрос возвращает лёгкие строки вместо объектов
+    ORM и не читает столбцы, которых в ответе нет.
+    """
+    return [getattr(source, field) for field in schema.model_fields]
+
+
+class ListSerializer:
+    """
+    Заранее собранная сериализация списка объектов в JSON по схеме.
+
+    adapter - проверка объектов через TypeAdapter(list[schema]) и запись
+    JSON средствами pydantic-core за один вызов. orjson - поля схемы
+    берутся из объектов как есть, без проверки, и кодируются orjson;
+    подходит только там, где типы столбцов уже совпадают со схемой.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.adapter = TypeAdapter(list[schema])
+        self.fields = tuple(schema.model_fields)
+
+    def adapter_body(self, rows: Sequence[Any]) -> bytes:
+        items = self.adapter.validate_python(rows, from_attributes=True)
+        return self.adapter.dump_json(items)
+
+    def orjson_body(self, rows: Sequence[Any]) -> bytes:
+        fields = self.fields
+        return orjson.dumps(
+            [{field: getattr(row, field) for field in fields} for row in rows],
+            # asyncpg возвращает UUID собственного класса, его orjson не знает.
+            default=str,
+        )
+
+
+def serialize_list(
+    serializer: ListSerializer,
+    rows: Sequence[Any],
+    response: Response,
+    mappings: bool = False,
+) -> Sequence[Any] | Response:
+    """
+    Ответ списочного эндпоинта по настройке RESPONSE_SERIALIZER.
+
+    В режиме default строки возвращаются как есть, и их сериализует
+    FastAPI по response_model; для эндпоинтов без response_model
+    (mappings=True) строки Core отдаются словарями. Иначе тело собирается
+    сразу, а заголовки, уже выставленные в response (ETag, курсор),
+    переносятся в ответ.
+    """
+    if settings.RESPONSE_SERIALIZER == "adapter":
+        body = serializer.adapter_body(rows)
+    elif settings.RESPONSE_SERIALIZER == "orjson":
+        body = serializer.orjson_body(rows)
+    elif mappings:
+        return [row._asdict() for row in rows]
+    else:
+        return rows
+
+    return Response(
+        content=body,
+        media_type=JSON_MEDIA_TYPE,
+        headers=dict(response.headers),
+    )
@@ -0,0 +1,43 @@
+"""
+Запуск приложения в продакшене.
+
+    python -m app.server
+
+Адрес берётся из SERVER_ADDRESS (host:port), число воркеров - из
+SERVER_WORKERS (по умолчанию по числу ядер); с VERSION_WRITE_BEHIND
+настройки принимаются только при SERVER_WORKERS=1. Цикл событий и
+HTTP-парсер выбираются uvicorn автоматически: uvloop и httptools, если
+установлены.
+По SIGTERM uvicorn перестаёт принимать соединения и ждёт завершения
+текущих запросов не дольше SERVER_GRACEFUL_TIMEOUT секунд.
+"""
+
+import os
+
+import uvicorn
+
+from app.config import settings
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host.strip("[]") or "0.0.0.0", int(port)
+
+
+def main() -> None:
+    host, port = parse_address(settings.SERVER_ADDRESS)
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=settings.SERVER_WORKERS or os.cpu_count() or 1,
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        access_log=settings.SERVER_ACCESS_LOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+
+from pydantic import TypeAdapter
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.changes.bus import RESET, ChangeEvent, change_bus
+from app.config import settings
+from app.pagination import encode_cursor, paginate
+from app.serialization import schema_columns
+from app.tender.models import Tender, TenderServiceType, TenderStatusType
+from app.tender.schemas import TenderSchema
+from app.tender.visibility import TENDER_KEYSET
+
+TENDER_LIST_ADAPTER = TypeAdapter(list[TenderSchema])
+
+PageKey = tuple[TenderServiceType | None, int, int, str | None]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPage:
+    body: bytes
+    etag: str
+    next_cursor: str | None
+
+
+class PublishedPageCache:
+    """
+    LRU-кэш готовых страниц GET /tenders со статусом Published.
+
+    Эти страницы одинаковы для всех пользователей, которые не отвечают ни
+    за одну организацию. Ключ - (service_type, limit, offset, cursor).
+    Каждая инвалидация увеличивает поколение, и страница, прочитанная из
+    БД до инвалидации, в кэш уже не попадёт.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: OrderedDict[PageKey, tuple[float, CachedPage]] = OrderedDict()
+
+    def get(self, key: PageKey) -> CachedPage | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, page = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return page
+
+    def put(self, key: PageKey, page: CachedPage, generation: int) -> None:
+        if generation != self.generation:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, page)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(
+        self, service_types: Iterable[TenderServiceType] | None = None
+    ) -> None:
+        """
+        Сбросить страницы указанных типов услуг и страницы без фильтра.
+
+        Без аргументов сбрасывается весь кэш.
+        """
+        self.generation += 1
+        if service_types is None:
+            self._entries.clear()
+            return
+
+        affected = {None, *service_types}
+        for key in [key for key in self._entries if key[0] in affected]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "generation": self.generation,
+        }
+
+
+published_pages = PublishedPageCache(
+    maxsize=settings.TENDER_PAGE_CACHE_SIZE,
+    ttl=settings.TENDER_PAGE_CACHE_TTL,
+)
+
+
+def published_page_query(
+    service_type: TenderServiceType | None,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+) -> Select:
+    """
+    Страница опубликованных тендеров, общая для всех пользователей.
+    """
+    query = select(*schema_columns(Tender, TenderSchema)).where(
+        Tender.status == TenderStatusType.Published
+    )
+    if service_type:
+        query = query.where(Tender.service_type == service_type)
+    return paginate(query, TENDER_KEYSET, limit, offset, cursor)
+
+
+async def get_published_page(
+    session: AsyncSession,
+    service_type: TenderServiceType | None,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+) -> CachedPage:
+    """
+    Страница опубликованных тендеров из кэша или из БД.
+    """
+    key = (service_type, limit, offset, cursor)
+    page = published_pages.get(key)
+    if page is not None:
+        return page
+
+    generation = published_pages.generation
+    query = published_page_query(service_type, limit, offset, cursor)
+    result = await session.execute(query)
+    tenders = result.all()
+
+    body = TENDER_LIST_ADAPTER.dump_json(
+        [
+            TenderSchema.model_validate(tender, from_attributes=True)
+            for tender in tenders
+        ]
+    )
+    next_cursor = None
+    if limit and len(tenders) == limit:
+        next_cursor = encode_cursor(
+            [getattr(tenders[-1], column.key) for column in TENDER_KEYSET]
+        )
+
+    page = CachedPage(
+        body=body,
+        etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+        next_cursor=next_cursor,
+    )
+    published_pages.put(key, page, generation)
+    return page
+
+
+def invalidate_published_pages(
+    *states: tuple[TenderStatusType, TenderServiceType],
+) -> None:
+    """
+    Сбросить страницы, которые могли измениться после записи тендера.
+
+    states - пары (status, service_type) тендера до и после изменения.
+    """
+    service_types = {
+        service_type
+        for status, service_type in states
+        if status == TenderStatusType.Published
+    }
+    if service_types:
+        published_pages.invalidate(service_types)
+
+
+def _on_tender_change(event: ChangeEvent) -> None:
+    if event.operation == RESET:
+        published_pages.clear()
+        return
+
+    invalidate_published_pages(
+        *(
+            (TenderStatusType(row["status"]), TenderServiceType(row["service_type"]))
+            for row in (event.previous, event.payload)
+            if row is not None
+        )
+    )
+
+
+change_bus.subscribe("tender", _on_tender_change)
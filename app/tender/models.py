@@ -8,8 +8,12 @@ from sqlalchemy import (
     TIMESTAMP,
     ForeignKey,
     CheckConstraint,
+    Computed,
     func,
+    Index,
+    text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from app.database import Base
 
@@ -44,6 +48,16 @@ class Tender(Base):
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=func.current_timestamp()
     )
+    # Вычисляется самой БД при любой вставке и изменении name/description.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     bids: Mapped[list["Bid"]] = relationship("Bid", back_populates="tender")
 
@@ -52,6 +66,23 @@ class Tender(Base):
             "version > 0",
             name="check_version_minimum",
         ),
+        Index("ix_tender_status_service_type_name", "status", "service_type", "name"),
+        Index(
+            "ix_tender_published_name",
+            "name",
+            "id",
+            postgresql_where=text("status = 'Published'"),
+        ),
+        Index(
+            "ix_tender_published_service_type_name",
+            "service_type",
+            "name",
+            "id",
+            postgresql_where=text("status = 'Published'"),
+        ),
+        Index("ix_tender_organization_id_name", "organization_id", "name", "id"),
+        Index("ix_tender_creator_username_name", "creator_username", "name", "id"),
+        Index("ix_tender_search_vector", "search_vector", postgresql_using="gin"),
     )
 
 
@@ -59,15 +90,18 @@ class TenderVersion(Base):
     __tablename__ = "tender_version"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    name: Mapped[str] = mapped_column(String(100))
-    description: Mapped[str] = mapped_column(Text())
-    service_type: Mapped[TenderServiceType]
-    status: Mapped[TenderStatusType]
-    organization_id: Mapped[uuid.UUID] = mapped_column(
+    # Поля, не изменившиеся относительно предыдущей версии, равны NULL
+    # во всех строках, кроме снимков (is_snapshot).
+    name: Mapped[str | None] = mapped_column(String(100))
+    description: Mapped[str | None] = mapped_column(Text())
+    service_type: Mapped[TenderServiceType | None]
+    status: Mapped[TenderStatusType | None]
+    organization_id: Mapped[uuid.UUID | None] = mapped_column(
         ForeignKey("organization.id", ondelete="CASCADE"),
     )
     version: Mapped[int] = mapped_column(default=1)
-    creator_username: Mapped[str] = mapped_column(String(50))
+    creator_username: Mapped[str | None] = mapped_column(String(50))
+    is_snapshot: Mapped[bool] = mapped_column(default=True)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=func.current_timestamp()
     )
@@ -80,4 +114,5 @@ class TenderVersion(Base):
             "version > 0",
             name="check_version_minimum",
         ),
+        Index("ix_tender_version_tender_id_version", "tender_id", "version"),
     )
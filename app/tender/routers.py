@@ -1,17 +1,56 @@
 import uuid
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import select, insert, or_, and_, update
-from sqlalchemy.exc import NoResultFound, IntegrityError
-
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.changes.bus import ChangeEvent
+from app.changes.streams import (
+    SSE_HEADERS,
+    SSE_MEDIA_TYPE,
+    status_events,
+    tender_streams,
+)
+from app.bulk import BulkItemResult, copy_to_staging, read_items, validate_items
+from app.conditional import (
+    etag_matches,
+    version_condition,
+    version_etag,
+    version_matches,
+)
+from app.config import settings
 from app.database import async_session_maker
-from app.user.models import User
-from app.organization.models import Organization, OrganizationResponsible
+from app.export import ExportFormat, export_response
+from app.serialization import ListSerializer, schema_columns, serialize_list
+from app.pagination import (
+    NEXT_CURSOR_HEADER,
+    encode_cursor,
+    paginate,
+    set_next_cursor,
+)
+from app.versioning import load_version, versioned_write
+from app.user.identity import (
+    UserIdentity,
+    get_user_by_username,
+    get_users_by_usernames,
+    identity_cache,
+)
+from app.organization.membership import membership_index
 from app.tender.models import (
     Tender,
     TenderVersion,
     TenderServiceType,
     TenderStatusType,
 )
+from app.tender.cache import (
+    get_published_page,
+    invalidate_published_pages,
+    published_pages,
+)
+from app.tender.search import search_condition, search_keyset
+from app.tender.visibility import TENDER_KEYSET, visible_tenders_query
 from app.tender.schemas import (
     TenderSchema,
     TenderCreateSchema,
@@ -24,58 +63,159 @@ router = APIRouter(
     tags=["Tenders"],
 )
 
+TENDER_LIST = ListSerializer(TenderSchema)
+
 
 @router.get("")
 async def get_tenders(
     username: str,
+    response: Response,
     limit: int = 5,
     offset: int = 0,
+    cursor: str | None = None,
     service_type: TenderServiceType = None,
+    if_none_match: str | None = Header(None),
 ) -> list[TenderSchema]:
     """
     Список тендеров с возможностью фильтрации по типу услуг.
 
     Если фильтры не заданы, возвращаются все тендеры доступные пользователю ответсвенному за органиизацию и со статусом Published.
+
+    Тендеры отсортированы по названию. Курсор следующей страницы возвращается в заголовке X-Next-Cursor, его можно передать вместо offset.
+
+    Пользователям, которые не отвечают ни за одну организацию, страницы отдаются из общего кэша с заголовком ETag, на If-None-Match с тем же значением возвращается 304.
     """
 
+    filters = []
+    if service_type:
+        filters.append(Tender.service_type == service_type)
+
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
+        user = identity_cache.get(username)
+        if user is not None and not await membership_index.organizations(
+            session, user.id
+        ):
+            page = await get_published_page(
+                session, service_type, limit, offset, cursor
             )
-
-        subquery = (
-            select(Tender.id)
-            .join(
-                OrganizationResponsible,
-                Tender.organization_id == OrganizationResponsible.organization_id,
+            headers = {
+                "ETag": page.etag,
+                "Cache-Control": f"private, max-age={settings.TENDER_PAGE_MAX_AGE}",
+            }
+            if etag_matches(if_none_match, page.etag):
+                return Response(status_code=304, headers=headers)
+            if page.next_cursor is not None:
+                headers[NEXT_CURSOR_HEADER] = page.next_cursor
+            return Response(
+                content=page.body, media_type="application/json", headers=headers
             )
-            .where(OrganizationResponsible.user_id == user.id)
-            .subquery()
+
+        query = visible_tenders_query(
+            username, filters, TENDER_KEYSET, limit, offset, cursor, TenderSchema
         )
+        result = await session.execute(query)
+        rows = result.all()
 
-        query = select(Tender).where(
-            or_(
-                Tender.id.in_(subquery),
-                Tender.status == TenderStatusType.Published,
-            )
+    if not rows:
+        raise HTTPException(
+            status_code=401,
+            detail="Такого пользователя нет",
         )
+    identity_cache.put(UserIdentity(id=rows[0].requester_id, username=username))
+
+    tenders = [row for row in rows if row.id is not None]
+    set_next_cursor(response, tenders, TENDER_KEYSET, limit)
+
+    return serialize_list(TENDER_LIST, tenders, response)
 
-        if service_type:
-            query = query.where(Tender.service_type == service_type).order_by(
-                Tender.name
-            )
 
-        query = query.limit(limit).offset(offset)
+def search_tenders_query(
+    username: str,
+    q: str,
+    service_type: TenderServiceType | None,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+) -> Select:
+    """
+    Страница поиска: видимые пользователю тендеры в порядке релевантности.
+    """
+    condition, tsquery = search_condition(q)
+    filters = [condition]
+    if service_type:
+        filters.append(Tender.service_type == service_type)
+
+    return visible_tenders_query(
+        username,
+        filters,
+        search_keyset(tsquery),
+        limit,
+        offset,
+        cursor,
+        TenderSchema,
+    )
+
+
+@router.get("/search")
+async def search_tenders(
+    username: str,
+    q: str,
+    response: Response,
+    limit: int = 5,
+    offset: int = 0,
+    cursor: str | None = None,
+    service_type: TenderServiceType = None,
+) -> list[TenderSchema]:
+    """
+    Полнотекстовый поиск по названию и описанию тендеров, доступных пользователю.
 
+    Результаты отсортированы по релевантности, совпадения в названии весят больше, чем в описании. Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
+    async with async_session_maker() as session:
+        query = search_tenders_query(username, q, service_type, limit, offset, cursor)
         result = await session.execute(query)
+        rows = result.all()
+
+    if not rows:
+        raise HTTPException(
+            status_code=401,
+            detail="Такого пользователя нет",
+        )
+    identity_cache.put(UserIdentity(id=rows[0].requester_id, username=username))
+
+    tenders = [row for row in rows if row.id is not None]
+    if limit and len(tenders) == limit:
+        last = tenders[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [last.negative_rank, last.id]
+        )
+
+    return serialize_list(TENDER_LIST, tenders, response)
+
+
+@router.get("/export")
+async def export_tenders(
+    username: str,
+    service_type: TenderServiceType = None,
+    format: ExportFormat = ExportFormat.ndjson,
+) -> StreamingResponse:
+    """
+    Выгрузка всех тендеров, доступных пользователю, потоком NDJSON или CSV.
+
+    Правила видимости и сортировка те же, что и у списка тендеров.
+    """
+    filters = []
+    if service_type:
+        filters.append(Tender.service_type == service_type)
+
+    async with async_session_maker() as session:
+        await get_user_by_username(session, username)
 
-        return result.scalars().all()
+    query = visible_tenders_query(username, filters)
+    query = query.with_only_columns(
+        query.column_descriptions[1]["entity"], maintain_column_froms=False
+    )
+    return export_response(query, TenderSchema, format)
 
 
 @router.post("/new")
@@ -85,40 +225,28 @@ async def create_tender(tender: TenderCreateSchema) -> TenderAllFieldsSchema:
     """
 
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == tender.creator_username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, tender.creator_username)
 
-        org_resp_query = select(OrganizationResponsible).filter(
-            OrganizationResponsible.organization_id == tender.organization_id,
-            OrganizationResponsible.user_id == user.id,
-        )
-        org_resp = await session.execute(org_resp_query)
-        org_resp = org_resp.scalars().all()
-
-        if len(org_resp) < 1:
+        if not await membership_index.is_responsible(
+            session, user.id, tender.organization_id
+        ):
             raise HTTPException(
                 status_code=401,
                 detail="Такой организации нет",
             )
 
-        query = (
-            insert(Tender)
-            .values(
+        query = versioned_write(
+            insert(Tender).values(
                 name=tender.name,
                 description=tender.description,
                 service_type=tender.service_type,
                 status=tender.status,
                 organization_id=tender.organization_id,
                 creator_username=tender.creator_username,
-            )
-            .returning(Tender)
+            ),
+            Tender,
+            TenderVersion,
+            "tender_id",
         )
         try:
             result = await session.execute(query)
@@ -127,99 +255,234 @@ async def create_tender(tender: TenderCreateSchema) -> TenderAllFieldsSchema:
                 status_code=400,
                 detail="Тендер с таким названием уже существует",
             )
+        tender_db = result.scalar_one()
         await session.commit()
+        invalidate_published_pages((tender_db.status, tender_db.service_type))
+
+        return tender_db
+
+
+TENDER_BULK_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "service_type",
+    "status",
+    "organization_id",
+    "version",
+    "creator_username",
+)
 
-        tender_db = result.scalar_one()
 
-        new_version_query = insert(TenderVersion).values(
-            name=tender_db.name,
-            description=tender_db.description,
-            service_type=tender_db.service_type,
-            status=tender_db.status,
-            organization_id=tender_db.organization_id,
-            creator_username=tender_db.creator_username,
-            version=tender_db.version,
-            tender_id=tender_db.id,
+@router.post("/bulk")
+async def create_tenders_bulk(request: Request) -> list[BulkItemResult]:
+    """
+    Массовое создание тендеров. Тело - JSON-массив или NDJSON из объектов, как в /tenders/new.
+
+    Права проверяются один раз на пару (пользователь, организация), строки загружаются через COPY, ошибки возвращаются для каждого элемента отдельно.
+    """
+    items = await read_items(request)
+    tenders, results = validate_items(items, TenderCreateSchema)
+
+    async with async_session_maker() as session:
+        users = await get_users_by_usernames(
+            session, (tender.creator_username for _, tender in tenders)
         )
-        await session.execute(new_version_query)
-        await session.commit()
 
-        return tender_db
+        allowed = {}
+        records = {}
+        for index, tender in tenders:
+            user = users.get(tender.creator_username)
+            if user is None:
+                results[index] = BulkItemResult(
+                    index=index, error="Такого пользователя нет"
+                )
+                continue
+
+            key = (user.id, tender.organization_id)
+            if key not in allowed:
+                allowed[key] = await membership_index.is_responsible(session, *key)
+            if not allowed[key]:
+                results[index] = BulkItemResult(
+                    index=index, error="Такой организации нет"
+                )
+                continue
+
+            records[index] = (
+                uuid.uuid4(),
+                tender.name,
+                tender.description,
+                tender.service_type.name,
+                tender.status.name,
+                tender.organization_id,
+                1,
+                tender.creator_username,
+            )
+
+        created = set()
+        if records:
+            staging = await copy_to_staging(
+                session, Tender.__table__, TENDER_BULK_COLUMNS, records.values()
+            )
+            query = versioned_write(
+                pg_insert(Tender)
+                .from_select(TENDER_BULK_COLUMNS, select(staging))
+                .on_conflict_do_nothing(),
+                Tender,
+                TenderVersion,
+                "tender_id",
+            )
+            result = await session.execute(query)
+            created_tenders = result.scalars().all()
+            await session.commit()
+
+            created = {tender.id for tender in created_tenders}
+            invalidate_published_pages(
+                *((tender.status, tender.service_type) for tender in created_tenders)
+            )
+
+        for index, record in records.items():
+            if record[0] in created:
+                results[index] = BulkItemResult(index=index, id=record[0])
+            else:
+                results[index] = BulkItemResult(
+                    index=index, error="Тендер с таким названием уже существует"
+                )
+
+        return [results[index] for index in sorted(results)]
+
+
+def user_tenders_query(username: str) -> Select:
+    return select(*schema_columns(Tender, TenderSchema)).where(
+        Tender.creator_username == username
+    )
 
 
 @router.get("/my")
 async def get_user_tenders(
-    username: str, limit: int = 5, offset: int = 0
+    username: str,
+    response: Response,
+    limit: int = 5,
+    offset: int = 0,
+    cursor: str | None = None,
 ) -> list[TenderSchema]:
     """
     Получение списка тендеров текущего пользователя.
 
-    Для удобства использования включена поддержка пагинации.
+    Для удобства использования включена поддержка пагинации: по offset или по курсору из заголовка X-Next-Cursor.
     """
 
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        await get_user_by_username(session, username)
 
-        query = (
-            select(Tender)
-            .where(Tender.creator_username == username)
-            .limit(limit)
-            .offset(offset)
+        query = paginate(
+            user_tenders_query(username), TENDER_KEYSET, limit, offset, cursor
         )
 
         result = await session.execute(query)
+        tenders = result.all()
+        set_next_cursor(response, tenders, TENDER_KEYSET, limit)
+
+        return serialize_list(TENDER_LIST, tenders, response)
+
+
+async def tender_visible(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    status: TenderStatusType,
+    organization_id: uuid.UUID,
+) -> bool:
+    if status == TenderStatusType.Published:
+        return True
+    return await membership_index.is_responsible(session, user_id, organization_id)
+
 
-        return result.scalars().all()
+def tender_state_query(tender_id: uuid.UUID) -> Select:
+    return select(Tender.status, Tender.organization_id, Tender.version).where(
+        Tender.id == tender_id
+    )
 
 
 @router.get("/{tender_id}/status")
 async def get_tender_status(
     tender_id: uuid.UUID,
     username: str,
+    response: Response,
+    if_none_match: str | None = Header(None),
 ) -> TenderStatusType | None:
     """
     Получить статус тендера по его уникальному идентификатору.
+
+    В заголовке ETag возвращается версия тендера, на If-None-Match с той же версией возвращается 304.
     """
 
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
-        query = (
-            select(Tender.status)
-            .join(
-                OrganizationResponsible,
-                Tender.organization_id == OrganizationResponsible.organization_id,
-            )
-            .where(
-                or_(
-                    and_(
-                        Tender.id == tender_id,
-                        OrganizationResponsible.user_id == user.id,
-                    ),
-                    Tender.status == TenderStatusType.Published,
-                )
-            )
-        )
+        result = await session.execute(tender_state_query(tender_id))
+        tender = result.one_or_none()
 
-        result = await session.execute(query)
+        if tender is None:
+            return None
+
+        if await tender_visible(
+            session, user.id, tender.status, tender.organization_id
+        ):
+            etag = version_etag(tender.version)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+            return tender.status
+
+        return None
+
+
+@router.get("/{tender_id}/events")
+async def tender_events(
+    tender_id: uuid.UUID,
+    username: str,
+) -> StreamingResponse:
+    """
+    Поток Server-Sent Events со статусом и версией тендера.
+
+    Доступ такой же, как у GET /tenders/{tender_id}/status. Первое событие содержит текущее состояние, следующие приходят после фиксации изменений тендера. Поток закрывается, если тендер удалён или перестал быть виден пользователю.
+    """
+    async with async_session_maker() as session:
+        user = await get_user_by_username(session, username)
+
+    async def load_state() -> dict | None:
+        async with async_session_maker() as session:
+            result = await session.execute(tender_state_query(tender_id))
+            tender = result.one_or_none()
+
+            if tender is None or not await tender_visible(
+                session, user.id, tender.status, tender.organization_id
+            ):
+                return None
+            return {"status": tender.status.value, "version": tender.version}
+
+    async def next_state(event: ChangeEvent) -> dict | None:
+        if event.payload is None:
+            return None
+
+        status = TenderStatusType(event.payload["status"])
+        organization_id = uuid.UUID(event.payload["organization_id"])
+        async with async_session_maker() as session:
+            if not await tender_visible(session, user.id, status, organization_id):
+                return None
+        return {"status": status.value, "version": event.payload["version"]}
+
+    if await load_state() is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Данного тендера не существует",
+        )
 
-        return result.scalar_one_or_none()
+    return StreamingResponse(
+        status_events(tender_streams, tender_id, load_state, next_state),
+        media_type=SSE_MEDIA_TYPE,
+        headers=SSE_HEADERS,
+    )
 
 
 @router.put("/{tender_id}/status")
@@ -227,71 +490,58 @@ async def change_tender_status(
     tender_id: uuid.UUID,
     status: TenderStatusType,
     username: str,
+    response: Response,
+    if_match: str | None = Header(None),
 ):
     """
     Изменить статус тендера по его идентификатору.
+
+    Если передан If-Match, статус меняется только при совпадении версии тендера, иначе возвращается 412.
     """
 
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
-        query = (
-            select(Tender)
-            .join(
-                OrganizationResponsible,
-                Tender.organization_id == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    Tender.id == tender_id,
-                    OrganizationResponsible.user_id == user.id,
-                )
-            )
-        )
+        query = select(Tender).where(Tender.id == tender_id)
 
         result = await session.execute(query)
+        tender = result.scalar_one_or_none()
 
-        try:
-            tender = result.scalar_one()
-        except NoResultFound:
+        if tender is None or not await membership_index.is_responsible(
+            session, user.id, tender.organization_id
+        ):
             raise HTTPException(
                 status_code=401,
                 detail="Данного тендера не существует",
             )
 
-        update_query = (
+        previous = (tender.status, tender.service_type)
+        update_query = versioned_write(
             update(Tender)
             .values(
                 status=status,
                 version=Tender.version + 1,
             )
-            .where(Tender.id == tender_id)
-            .returning(Tender)
+            .where(
+                Tender.id == tender_id,
+                version_condition(Tender.version, if_match),
+            ),
+            Tender,
+            TenderVersion,
+            "tender_id",
         )
         updated_tender = await session.execute(update_query)
-        await session.commit()
         updated_tender = updated_tender.scalar_one_or_none()
-
-        new_version_query = insert(TenderVersion).values(
-            name=updated_tender.name,
-            description=updated_tender.description,
-            service_type=updated_tender.service_type,
-            status=updated_tender.status,
-            organization_id=updated_tender.organization_id,
-            creator_username=updated_tender.creator_username,
-            version=updated_tender.version,
-            tender_id=updated_tender.id,
-        )
-        await session.execute(new_version_query)
+        if updated_tender is None:
+            raise HTTPException(
+                status_code=412,
+                detail="Версия тендера изменилась",
+            )
         await session.commit()
+        invalidate_published_pages(
+            previous, (updated_tender.status, updated_tender.service_type)
+        )
+        response.headers["ETag"] = version_etag(updated_tender.version)
 
         return updated_tender.status
 
@@ -300,83 +550,73 @@ async def change_tender_status(
 async def edit_tender(
     tender_id: uuid.UUID,
     username: str,
+    response: Response,
     tender_update: TenderUpdate = None,
+    if_match: str | None = Header(None),
 ) -> TenderSchema:
     """
     Изменение параметров существующего тендера.
+
+    Если передан If-Match, изменения применяются только при совпадении версии тендера, иначе возвращается 412.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
-        query = (
-            select(Tender)
-            .join(
-                OrganizationResponsible,
-                Tender.organization_id == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    Tender.id == tender_id,
-                    OrganizationResponsible.user_id == user.id,
-                )
-            )
-        )
+        query = select(Tender).where(Tender.id == tender_id)
 
         result = await session.execute(query)
+        tender = result.scalar_one_or_none()
 
-        try:
-            tender = result.scalar_one()
-        except NoResultFound:
+        if tender is None or not await membership_index.is_responsible(
+            session, user.id, tender.organization_id
+        ):
             raise HTTPException(
                 status_code=404,
                 detail="Данного тендера не существует",
             )
 
         update_values = {}
-        for key, value in tender_update:
-            if value != "" or value is not None:
+        for key, value in tender_update or ():
+            if value != "" and value is not None:
                 update_values[key] = value
 
         if update_values:
-            update_query = (
+            previous = (tender.status, tender.service_type)
+            update_query = versioned_write(
                 update(Tender)
-                .where(Tender.id == tender_id)
+                .where(
+                    Tender.id == tender_id,
+                    version_condition(Tender.version, if_match),
+                )
                 .values(
                     **update_values,
                     version=Tender.version + 1,
-                )
-                .returning(Tender)
-            )
-            new_version_query = insert(TenderVersion).values(
-                name=tender.name
-                if "name" not in update_values.keys()
-                else update_values["name"],
-                description=tender.description
-                if "description" not in update_values.keys()
-                else update_values["description"],
-                service_type=tender.service_type
-                if "service_type" not in update_values.keys()
-                else update_values["service_type"],
-                status=tender.status,
-                organization_id=tender.organization_id,
-                creator_username=tender.creator_username,
-                version=tender.version + 1,
-                tender_id=tender.id,
+                ),
+                Tender,
+                TenderVersion,
+                "tender_id",
             )
             updated_tender = await session.execute(update_query)
-            await session.execute(new_version_query)
+            updated_tender = updated_tender.scalar_one_or_none()
+            if updated_tender is None:
+                raise HTTPException(
+                    status_code=412,
+                    detail="Версия тендера изменилась",
+                )
             await session.commit()
+            invalidate_published_pages(
+                previous, (updated_tender.status, updated_tender.service_type)
+            )
 
-            return updated_tender.scalar_one_or_none()
+            response.headers["ETag"] = version_etag(updated_tender.version)
+            return updated_tender
         else:
+            if not version_matches(tender.version, if_match):
+                raise HTTPException(
+                    status_code=412,
+                    detail="Версия тендера изменилась",
+                )
+            response.headers["ETag"] = version_etag(tender.version)
             return tender
 
 
@@ -385,48 +625,30 @@ async def tender_rollback(
     tender_id: uuid.UUID,
     version: int,
     username: str,
+    response: Response,
+    if_match: str | None = Header(None),
 ):
     """
     Откатить параметры тендера к указанной версии. Это считается новой правкой, поэтому версия инкрементируется.
+
+    Если передан If-Match, откат выполняется только при совпадении текущей версии тендера, иначе возвращается 412.
     """
     async with async_session_maker() as session:
-        user_query = select(User).where(User.username == username)
-        user = await session.execute(user_query)
-        try:
-            user = user.scalar_one()
-        except NoResultFound:
-            raise HTTPException(
-                status_code=401,
-                detail="Такого пользователя нет",
-            )
+        user = await get_user_by_username(session, username)
 
-        query = (
-            select(TenderVersion)
-            .join(
-                OrganizationResponsible,
-                TenderVersion.organization_id
-                == OrganizationResponsible.organization_id,
-            )
-            .where(
-                and_(
-                    TenderVersion.tender_id == tender_id,
-                    OrganizationResponsible.user_id == user.id,
-                    TenderVersion.version == version,
-                )
-            )
+        tender_version = await load_version(
+            session, TenderVersion, "tender_id", tender_id, version
         )
 
-        result = await session.execute(query)
-
-        try:
-            tender_version = result.scalar_one()
-        except NoResultFound:
+        if tender_version is None or not await membership_index.is_responsible(
+            session, user.id, tender_version.organization_id
+        ):
             raise HTTPException(
                 status_code=404,
                 detail="Данного тендера не существует",
             )
 
-        update_tender_query = (
+        update_tender_query = versioned_write(
             update(Tender)
             .values(
                 name=tender_version.name,
@@ -437,24 +659,26 @@ async def tender_rollback(
                 version=Tender.version + 1,
                 creator_username=tender_version.creator_username,
             )
-            .where(Tender.id == tender_id)
-            .returning(Tender)
+            .where(
+                Tender.id == tender_id,
+                version_condition(Tender.version, if_match),
+            ),
+            Tender,
+            TenderVersion,
+            "tender_id",
         )
         updated_tender = await session.execute(update_tender_query)
+        updated_tender = updated_tender.scalar_one_or_none()
+        if updated_tender is None:
+            raise HTTPException(
+                status_code=412,
+                detail="Версия тендера изменилась",
+            )
         await session.commit()
-        updated_tender = updated_tender.scalar_one()
-
-        new_version_query = insert(TenderVersion).values(
-            name=updated_tender.name,
-            description=updated_tender.description,
-            service_type=updated_tender.service_type,
-            status=updated_tender.status,
-            organization_id=updated_tender.organization_id,
-            creator_username=updated_tender.creator_username,
-            version=updated_tender.version,
-            tender_id=updated_tender.id,
-        )
-        await session.execute(new_version_query)
-        await session.commit()
+        # Прежнее состояние тендера здесь не читается, поэтому кэш
+        # опубликованных страниц сбрасывается целиком.
+        published_pages.invalidate()
+
+        response.headers["ETag"] = version_etag(updated_tender.version)
 
         return updated_tender
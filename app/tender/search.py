@@ -0,0 +1,24 @@
+from sqlalchemy import REAL, ColumnElement, Label, func, literal_column
+
+from app.tender.models import Tender
+
+# Конфигурация совпадает с той, по которой вычисляется Tender.search_vector.
+SEARCH_CONFIG = literal_column("'russian'::regconfig")
+
+
+def search_condition(q: str) -> tuple[ColumnElement[bool], ColumnElement]:
+    """
+    Условие полнотекстового поиска по search_vector и сам tsquery.
+
+    Строка запроса разбирается websearch_to_tsquery: поддерживаются
+    кавычки, OR и минус перед исключаемым словом.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    return Tender.search_vector.op("@@")(tsquery), tsquery
+
+
+def search_keyset(tsquery: ColumnElement) -> tuple[Label, ColumnElement]:
+    # keyset сравнивается по возрастанию, а ранг нужен по убыванию,
+    # поэтому сортировка идёт по рангу со знаком минус.
+    negative_rank = -func.ts_rank(Tender.search_vector, tsquery, type_=REAL)
+    return negative_rank.label("negative_rank"), Tender.id
@@ -0,0 +1,100 @@
+from typing import Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Label, Select, exists, select, true, union_all
+from sqlalchemy.orm import InstrumentedAttribute, aliased
+
+from app.organization.models import OrganizationResponsible
+from app.pagination import keyset_after
+from app.serialization import schema_columns
+from app.tender.models import Tender, TenderStatusType
+from app.user.models import User
+
+TENDER_KEYSET = (Tender.name, Tender.id)
+
+# Вычисляемые столбцы (search_vector) не протаскиваются через UNION ALL.
+TENDER_COLUMNS = [column for column in Tender.__table__.c if column.computed is None]
+
+
+def visible_tenders_query(
+    username: str,
+    filters: Sequence[ColumnElement[bool]] = (),
+    keyset: Sequence[InstrumentedAttribute | Label] = TENDER_KEYSET,
+    limit: int | None = None,
+    offset: int = 0,
+    cursor: str | None = None,
+    schema: type[BaseModel] | None = None,
+) -> Select:
+    """
+    Один запрос, который находит пользователя и видимые ему тендеры.
+
+    Тендеры организаций пользователя и чужие тендеры со статусом Published
+    выбираются двумя ветками UNION ALL, в каждую из которых опускаются
+    фильтры, сортировка и лимит, поэтому обе ветки идут по индексам.
+
+    Запрос возвращает строки (requester_id, Tender). Если пользователя нет,
+    строк нет вовсе, а если видимых тендеров нет - будет одна строка с
+    Tender равным None. Если передана schema, вместо Tender в строке идут
+    только столбцы схемы (при отсутствии тендеров они равны NULL).
+
+    В keyset, кроме столбцов Tender, можно передать именованные выражения
+    над ним (например, ранг поиска): они вычисляются в ветках и
+    добавляются в конец каждой строки результата.
+    """
+    requester = select(User.id).where(User.username == username).cte("requester")
+    requester_id = select(requester.c.id).scalar_subquery()
+
+    branch_filters = list(filters)
+    if cursor is not None:
+        branch_filters.append(keyset_after(keyset, cursor))
+        offset = 0
+
+    expressions = [column for column in keyset if isinstance(column, Label)]
+
+    member_tenders = select(*TENDER_COLUMNS, *expressions).where(
+        Tender.organization_id.in_(
+            select(OrganizationResponsible.organization_id).where(
+                OrganizationResponsible.user_id == requester_id
+            )
+        ),
+        *branch_filters,
+    )
+    published_tenders = select(*TENDER_COLUMNS, *expressions).where(
+        Tender.status == TenderStatusType.Published,
+        ~exists().where(
+            OrganizationResponsible.user_id == requester_id,
+            OrganizationResponsible.organization_id == Tender.organization_id,
+        ),
+        *branch_filters,
+    )
+
+    branches = []
+    for branch in (member_tenders, published_tenders):
+        branch = branch.order_by(*keyset)
+        if limit is not None:
+            branch = branch.limit(limit + offset)
+        branches.append(branch.subquery().select())
+
+    visible = union_all(*branches)
+    visible = visible.order_by(
+        *(visible.selected_columns[column.key] for column in keyset)
+    )
+    if limit is not None:
+        visible = visible.limit(limit).offset(offset)
+    visible = visible.subquery("visible")
+
+    if schema is None:
+        tender = [aliased(Tender, visible)]
+    else:
+        tender = schema_columns(visible.c, schema)
+
+    return (
+        select(
+            requester.c.id.label("requester_id"),
+            *tender,
+            *(visible.c[expression.key] for expression in expressions),
+        )
+        .select_from(requester)
+        .outerjoin(visible, true())
+        .order_by(*(visible.c[column.key] for column in keyset))
+    )
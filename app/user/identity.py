@@ -0,0 +1,143 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.changes.bus import RESET, ChangeEvent, change_bus
+from app.config import settings
+from app.user.models import User
+
+
+@dataclass(frozen=True, slots=True)
+class UserIdentity:
+    id: uuid.UUID
+    username: str
+
+
+class IdentityCache:
+    """
+    Ограниченный LRU-кэш username -> UserIdentity с временем жизни записей.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, UserIdentity]] = OrderedDict()
+
+    def get(self, username: str) -> UserIdentity | None:
+        entry = self._entries.get(username)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, identity = entry
+        if expires_at < time.monotonic():
+            del self._entries[username]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(username)
+        self.hits += 1
+        return identity
+
+    def put(self, identity: UserIdentity) -> None:
+        self._entries[identity.username] = (time.monotonic() + self.ttl, identity)
+        self._entries.move_to_end(identity.username)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+identity_cache = IdentityCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+)
+
+
+def _on_user_change(event: ChangeEvent) -> None:
+    if event.operation == RESET:
+        identity_cache.clear()
+        return
+
+    for row in (event.previous, event.payload):
+        if row is not None:
+            identity_cache.invalidate(row["username"])
+
+
+change_bus.subscribe("employee", _on_user_change)
+
+
+async def get_user_by_username(
+    session: AsyncSession,
+    username: str,
+) -> UserIdentity:
+    """
+    Найти пользователя по имени, сначала в кэше, затем в БД.
+
+    Если пользователя нет, выбрасывается 401.
+    """
+    identity = identity_cache.get(username)
+    if identity is not None:
+        return identity
+
+    query = select(User.id, User.username).where(User.username == username)
+    result = await session.execute(query)
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Такого пользователя нет",
+        )
+
+    identity = UserIdentity(id=row.id, username=row.username)
+    identity_cache.put(identity)
+    return identity
+
+
+async def get_users_by_usernames(
+    session: AsyncSession,
+    usernames: Iterable[str],
+) -> dict[str, UserIdentity]:
+    """
+    Найти сразу несколько пользователей: промахи кэша добираются одним запросом.
+
+    Отсутствующих пользователей в результате нет.
+    """
+    found = {}
+    missing = set()
+    for username in set(usernames):
+        identity = identity_cache.get(username)
+        if identity is None:
+            missing.add(username)
+        else:
+            found[username] = identity
+
+    if missing:
+        query = select(User.id, User.username).where(User.username.in_(missing))
+        result = await session.execute(query)
+        for row in result:
+            identity = UserIdentity(id=row.id, username=row.username)
+            identity_cache.put(identity)
+            found[identity.username] = identity
+
+    return found
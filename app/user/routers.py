@@ -3,6 +3,7 @@ from sqlalchemy import insert, select
 
 from app.user.models import User
 from app.user.schemas import UserCreateSchema, UserSchema
+from app.user.identity import identity_cache
 from app.database import async_session_maker
 
 router = APIRouter(
@@ -29,3 +30,5 @@ async def create_user(user: UserCreateSchema):
         )
         await session.execute(query)
         await session.commit()
+
+    identity_cache.invalidate(user.username)
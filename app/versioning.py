@@ -0,0 +1,276 @@
+import logging
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import (
+    CTE,
+    Insert,
+    Select,
+    Update,
+    case,
+    event,
+    func,
+    insert,
+    select,
+    true,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, aliased
+
+from app.config import settings
+from app.database import Base
+from app.history import history_writer
+
+logger = logging.getLogger(__name__)
+
+# Строки истории текущей транзакции сессии в режиме write-behind.
+PENDING_HISTORY = "pending_history"
+
+
+def versioned_fields(version_model: type[Base], foreign_key: str) -> list[str]:
+    return [
+        column.key
+        for column in version_model.__table__.c
+        if column.key not in ("id", "created_at", "is_snapshot", foreign_key)
+    ]
+
+
+def versioned_ctes(
+    statement: Insert | Update,
+    model: type[Base],
+    version_model: type[Base],
+    foreign_key: str,
+    name: str = "head",
+) -> tuple[CTE, CTE]:
+    """
+    CTE записи основной строки (RETURNING) и CTE вставки её версии.
+
+    Нужны, чтобы собрать несколько версионируемых изменений в один запрос,
+    имена CTE в таком запросе задаются через name.
+    """
+    fields = versioned_fields(version_model, foreign_key)
+    tracked = [field for field in fields if field != "version"]
+    # Вычисляемые столбцы (например, tsvector) в ответе не нужны.
+    returning = [column for column in model.__table__.c if column.computed is None]
+
+    if isinstance(statement, Insert):
+        if statement.select is None:
+            # Python-умолчания не вычисляются внутри CTE, поэтому id задаётся явно.
+            statement = statement.values(id=uuid.uuid4())
+    else:
+        previous = (
+            select(model.id, *(model.__table__.c[field] for field in tracked))
+            .where(statement.whereclause)
+            # Ключ строки не меняется, поэтому FOR NO KEY UPDATE: он не
+            # конфликтует с FOR KEY SHARE, который берут проверки внешних
+            # ключей при вставке решений и счётчиков по этой же строке.
+            .with_for_update(key_share=True)
+            .subquery(f"{name}_previous")
+        )
+        statement = statement.where(model.id == previous.c.id)
+        returning += [previous.c[field].label(f"previous_{field}") for field in tracked]
+
+    head = statement.returning(*returning).cte(name)
+
+    if isinstance(statement, Insert):
+        is_snapshot = true()
+        values = [head.c[field] for field in fields]
+    else:
+        is_snapshot = (head.c.version - 1) % settings.VERSION_SNAPSHOT_INTERVAL == 0
+        values = [
+            (
+                head.c[field]
+                if field == "version"
+                else case(
+                    (
+                        is_snapshot
+                        | head.c[field].is_distinct_from(head.c[f"previous_{field}"]),
+                        head.c[field],
+                    )
+                )
+            )
+            for field in fields
+        ]
+
+    history = insert(version_model).from_select(
+        ["id", "is_snapshot", *fields, foreign_key],
+        select(func.gen_random_uuid(), is_snapshot, *values, head.c.id),
+    )
+
+    return head, history.cte(f"{name}_history")
+
+
+def versioned_write(
+    statement: Insert | Update,
+    model: type[Base],
+    version_model: type[Base],
+    foreign_key: str,
+) -> Select:
+    """
+    Записать строку и её версию одним запросом.
+
+    Вставка или изменение основной строки и вставка строки истории
+    объединяются в один запрос с data-modifying CTE:
+
+        WITH head AS (INSERT/UPDATE ... RETURNING *),
+             history AS (INSERT INTO <version_model> SELECT ... FROM head)
+        SELECT * FROM head
+
+    История хранится в виде дельт: каждая VERSION_SNAPSHOT_INTERVAL-я
+    версия записывается целиком, а в остальных заполнены только поля,
+    изменившиеся относительно предыдущей версии (прочие равны NULL).
+    Прежние значения UPDATE берёт из подзапроса FOR NO KEY UPDATE во FROM.
+
+    INSERT ... SELECT должен сам передавать id всех вставляемых строк.
+
+    Запрос возвращает обновлённые объекты model.
+
+    В режиме VERSION_WRITE_BEHIND история в запрос не входит: запрос
+    дополнительно возвращает прежние значения, строки истории считаются
+    при выполнении и после фиксации транзакции уходят в history_writer.
+    """
+    head, history = versioned_ctes(statement, model, version_model, foreign_key)
+
+    if settings.VERSION_WRITE_BEHIND:
+        previous = [column for column in head.c if column.key.startswith("previous_")]
+        return select(aliased(model, head), *previous).execution_options(
+            populate_existing=True,
+            versioned_history=(version_model, foreign_key),
+        )
+
+    return (
+        select(aliased(model, head))
+        .add_cte(history)
+        .execution_options(populate_existing=True)
+    )
+
+
+def history_values(row, version_model: type[Base], foreign_key: str) -> dict:
+    """
+    Строка истории для строки результата versioned_write в режиме write-behind.
+
+    Повторяет правила versioned_ctes: снимок для новой строки и каждой
+    VERSION_SNAPSHOT_INTERVAL-й версии, иначе только изменённые поля.
+    """
+    entity = row[0]
+    mapping = row._mapping
+    is_snapshot = (
+        len(row) == 1 or (entity.version - 1) % settings.VERSION_SNAPSHOT_INTERVAL == 0
+    )
+
+    values = {"id": uuid.uuid4(), "is_snapshot": is_snapshot, foreign_key: entity.id}
+    for field in versioned_fields(version_model, foreign_key):
+        value = getattr(entity, field)
+        if field == "version" or is_snapshot or value != mapping[f"previous_{field}"]:
+            values[field] = value
+        else:
+            values[field] = None
+    return values
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_history(orm_execute_state: ORMExecuteState):
+    target = orm_execute_state.execution_options.get("versioned_history")
+    if target is None:
+        return None
+
+    version_model, foreign_key = target
+    frozen = orm_execute_state.invoke_statement().freeze()
+    pending = orm_execute_state.session.info.setdefault(PENDING_HISTORY, [])
+    pending.extend(
+        (version_model, history_values(row, version_model, foreign_key))
+        for row in frozen()
+    )
+    return frozen()
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_history(session: Session) -> None:
+    pending = session.info.pop(PENDING_HISTORY, None)
+    if pending:
+        history_writer.put(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_history(session: Session) -> None:
+    session.info.pop(PENDING_HISTORY, None)
+
+
+def version_chain_query(
+    version_model: type[Base],
+    foreign_key: str,
+    entity_id: uuid.UUID,
+    version: int,
+) -> Select:
+    """
+    Строки истории от ближайшего снимка не позже version до неё самой.
+    """
+    owner = getattr(version_model, foreign_key)
+    snapshot = (
+        select(func.max(version_model.version))
+        .where(
+            owner == entity_id,
+            version_model.version <= version,
+            version_model.is_snapshot,
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(version_model)
+        .where(
+            owner == entity_id,
+            version_model.version <= version,
+            version_model.version >= snapshot,
+        )
+        .order_by(version_model.version)
+    )
+
+
+async def load_version(
+    session: AsyncSession,
+    version_model: type[Base],
+    foreign_key: str,
+    entity_id: uuid.UUID,
+    version: int,
+) -> Base | None:
+    """
+    Восстановить версию из ближайшего снимка и следующих за ним дельт.
+
+    Читается не больше VERSION_SNAPSHOT_INTERVAL строк истории по индексу
+    (foreign_key, version). Возвращается несохранённый объект version_model
+    со всеми полями либо None, если такой версии нет.
+
+    В режиме write-behind перед чтением дописывается очередь истории; если
+    это не удалось, отвечаем 503. Строки, потерянные при аварийной остановке,
+    оставляют в цепочке пропуски: такую версию не собираем и отвечаем 409.
+    """
+    if settings.VERSION_WRITE_BEHIND:
+        try:
+            await history_writer.flush()
+        except Exception:
+            logger.exception("Не удалось дописать историю версий")
+            raise HTTPException(
+                status_code=503,
+                detail="История версий временно недоступна",
+            )
+
+    query = version_chain_query(version_model, foreign_key, entity_id, version)
+    result = await session.execute(query)
+    rows = result.scalars().all()
+    if not rows or rows[-1].version != version:
+        return None
+
+    if [row.version for row in rows] != list(range(rows[0].version, version + 1)):
+        raise HTTPException(
+            status_code=409,
+            detail="История версий неполна, версию нельзя восстановить",
+        )
+
+    state = {}
+    for row in rows:
+        for field in versioned_fields(version_model, foreign_key):
+            value = getattr(row, field)
+            if value is not None:
+                state[field] = value
+
+    return version_model(**state, **{foreign_key: entity_id})
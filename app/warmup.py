@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import uuid
+from typing import Callable
+
+from sqlalchemy import Select, cast, null, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.bid.models import Bid, BidDecision
+from app.bid.routers import bid_state_query
+from app.tender.cache import published_page_query
+from app.tender.models import Tender
+from app.tender.routers import tender_state_query
+from app.tender.schemas import TenderSchema
+from app.tender.visibility import visible_tenders_query
+from app.user.models import User
+
+logger = logging.getLogger(__name__)
+
+# Столбцы-перечисления: asyncpg запрашивает описание типа при первой
+# встрече с ним на каждом соединении.
+ENUM_COLUMNS = [
+    Tender.status,
+    Tender.service_type,
+    Bid.status,
+    Bid.author_type,
+    BidDecision.decision,
+]
+
+# Запросы в том же виде, в каком их строят роутеры, чтобы совпали и
+# скомпилированный SQL в кэше SQLAlchemy, и подготовленные выражения asyncpg.
+HOT_QUERIES: list[Callable[[], Select]] = [
+    lambda: select(*(cast(null(), column.type) for column in ENUM_COLUMNS)),
+    lambda: select(User.id, User.username).where(User.username == ""),
+    lambda: tender_state_query(uuid.uuid4()),
+    lambda: bid_state_query(uuid.uuid4()),
+    lambda: visible_tenders_query("", limit=5, schema=TenderSchema),
+    lambda: published_page_query(None, limit=5, offset=0, cursor=None),
+]
+
+
+async def warm_connection(connection: AsyncConnection) -> None:
+    for build in HOT_QUERIES:
+        await connection.execute(build())
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> None:
+    """
+    Открыть connections соединений пула и подготовить на них горячие запросы.
+
+    Соединения открываются одновременно, поэтому после прогрева в пуле
+    остаётся столько же готовых соединений. Прогрев только ускоряет первые
+    запросы, поэтому его ошибки записываются в лог и запуск не прерывают.
+    """
+
+    async def warm_one() -> None:
+        try:
+            async with engine.connect() as connection:
+                await warm_connection(connection)
+        except Exception:
+            logger.exception("Не удалось прогреть соединение")
+
+    await asyncio.gather(*(warm_one() for _ in range(connections)))
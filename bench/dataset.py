@@ -0,0 +1,710 @@
+"""
+Генератор синтетических данных для схемы тендеров.
+
+Скрипт создаёт организации, пользователей и ответственных, а затем
+тендеры с предложениями, историями версий, решениями и отзывами в
+объёмах, сравнимых с продакшеном. Данные пишутся через COPY из
+нескольких процессов: тендеры делятся на пачки по --chunk, каждая пачка
+вместе со своими предложениями загружается одной транзакцией.
+
+Распределения:
+
+- размеры организаций по закону Ципфа (--skew): у крупных организаций
+  больше ответственных и тендеров;
+- у тендеров и предложений встречаются все статусы, история версий
+  собирается из правок, смен статуса и откатов; число версий и
+  предложений на тендер - с длинным хвостом;
+- история хранится так же, как её пишет versioned_write: каждая
+  VERSION_SNAPSHOT_INTERVAL-я версия - снимок, в остальных заполнены
+  только изменившиеся поля;
+- у закрытых тендеров есть предложение с кворумом одобрений, часть
+  отменённых предложений отклонена, bid_decision_tally согласована с
+  bid_decision.
+
+Результат определяется только --seed и размерами: каждая сущность
+получает свой генератор случайных чисел, поэтому число процессов и
+размер пачки на данные не влияют. Все имена начинаются с --prefix,
+внешние ключи и ограничения уникальности моделей соблюдаются.
+
+Если у пользователя БД есть права, загрузка идёт с
+session_replication_role = replica: триггеры (в том числе запись в
+change_outbox и проверки внешних ключей) не срабатывают. Иначе каждая
+пачка попадает и в change_outbox, откуда её уберёт очистка шины.
+После загрузки выполняется ANALYZE.
+
+    python -m bench.dataset [--tenders 1000000] [--organizations 5000]
+        [--users 100000] [--bids 3] [--workers 8] [--seed 1] [--prefix gen]
+    python -m bench.dataset --clean [--prefix gen]
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import itertools
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+import asyncpg
+from sqlalchemy import make_url
+
+from app.bid.decisions import QUORUM_LIMIT
+from app.config import settings
+
+BASE_TIME = datetime(2023, 1, 1)
+PERIOD = timedelta(days=365)
+
+MAX_RESPONSIBLES = 10
+MAX_BIDS = 300
+
+TENDER_STATUSES = ("Created", "Published", "Closed")
+SERVICE_TYPES = ("Construction", "Delivery", "Manufacture")
+ORGANIZATION_TYPES = ("IE", "LLC", "JSC")
+
+WORDS = (
+    "поставка бетон арматура щебень песок кирпич доставка монтаж демонтаж "
+    "ремонт кровля фасад фундамент окна двери отопление вентиляция "
+    "электрика освещение кабель трубы насосы металлоконструкции склад "
+    "перевозка контейнер погрузка упаковка производство деталей станки "
+    "пресс форма литьё сварка покраска сборка проектирование смета "
+    "школа больница дорога мост парковка офис склад цех"
+).split()
+FIRST_NAMES = ("Анна", "Иван", "Мария", "Олег", "Ольга", "Пётр", "Сергей", "Юлия")
+LAST_NAMES = ("Иванов", "Петров", "Смирнов", "Кузнецов", "Попов", "Соколов")
+
+TENDER_FIELDS = (
+    "name",
+    "description",
+    "service_type",
+    "status",
+    "organization_id",
+    "version",
+    "creator_username",
+)
+BID_FIELDS = (
+    "name",
+    "description",
+    "status",
+    "author_type",
+    "author_id",
+    "tender_id",
+    "version",
+)
+
+# Таблицы пачки в порядке загрузки (по внешним ключам) и их столбцы.
+CHUNK_TABLES = {
+    "tender": ("id", *TENDER_FIELDS, "created_at"),
+    "tender_version": ("id", *TENDER_FIELDS, "is_snapshot", "created_at", "tender_id"),
+    "bid": ("id", *BID_FIELDS, "created_at"),
+    "bid_version": ("id", *BID_FIELDS, "is_snapshot", "created_at", "bid_id"),
+    "bid_responsible": ("id", "bid_id", "organization_id"),
+    "bid_decision": ("id", "bid_id", "decision", "username"),
+    "bid_decision_tally": ("bid_id", "approved", "rejected"),
+    "bid_review": ("id", "description", "bid_id", "created_at"),
+}
+
+
+@dataclass(frozen=True)
+class Plan:
+    seed: int
+    prefix: str
+    bids: float
+    versions: float
+    snapshot_interval: int
+    # Накопленные веса организаций и диапазоны их ответственных
+    # (номер первого пользователя, число) - для выбора без общих данных.
+    cum_weights: tuple[float, ...]
+    responsibles: tuple[tuple[int, int], ...]
+    plain_users: tuple[int, int]
+
+    def organization_id(self, index: int) -> uuid.UUID:
+        return stable_id(self.seed, "organization", index)
+
+    def user_id(self, index: int) -> uuid.UUID:
+        return stable_id(self.seed, "user", index)
+
+    def username(self, index: int) -> str:
+        return f"{self.prefix}-u{index}"
+
+    def pick_organization(self, rng: random.Random) -> int:
+        return bisect.bisect(self.cum_weights, rng.random() * self.cum_weights[-1])
+
+    def pick_responsible(self, rng: random.Random, organization: int) -> int:
+        start, count = self.responsibles[organization]
+        return start + rng.randrange(count)
+
+
+def stable_id(seed: int, kind: str, index: int) -> uuid.UUID:
+    """
+    UUID, одинаковый во всех процессах: на организации и пользователей
+    ссылаются пачки, которые генерируются независимо.
+    """
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=16)
+    return uuid.UUID(bytes=digest.digest(), version=4)
+
+
+def random_id(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def words(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def long_tail(rng: random.Random, mean: float, limit: int) -> int:
+    # Парето с показателем 2 имеет среднее 2, отсюда деление пополам.
+    return min(limit, int(mean * rng.paretovariate(2.0) / 2))
+
+
+def later(rng: random.Random, moment: datetime, hours: int = 72) -> datetime:
+    return moment + timedelta(seconds=rng.randrange(60, hours * 3600))
+
+
+def history_rows(
+    states: list[dict],
+    fields: tuple[str, ...],
+    times: list[datetime],
+    entity_id: uuid.UUID,
+    snapshot_interval: int,
+    rng: random.Random,
+) -> list[tuple]:
+    """
+    Строки истории в формате versioned_write: снимок на каждой
+    snapshot_interval-й версии, иначе только изменившиеся поля.
+    """
+    rows = []
+    previous = None
+    for version, (state, moment) in enumerate(zip(states, times), start=1):
+        is_snapshot = (version - 1) % snapshot_interval == 0
+        values = [
+            (
+                version
+                if field == "version"
+                else (
+                    state[field]
+                    if is_snapshot or state[field] != previous[field]
+                    else None
+                )
+            )
+            for field in fields
+        ]
+        rows.append((random_id(rng), *values, is_snapshot, moment, entity_id))
+        previous = state
+    return rows
+
+
+def evolve(
+    rng: random.Random,
+    states: list[dict],
+    versions: int,
+    edit: Callable[[random.Random, dict], dict],
+) -> list[dict]:
+    # Каждая следующая версия - правка, смена статуса или откат к
+    # одной из прежних версий целиком, как в эндпоинтах rollback.
+    while len(states) < versions:
+        if len(states) > 2 and rng.random() < 0.1:
+            state = dict(rng.choice(states[:-1]))
+        else:
+            state = edit(rng, dict(states[-1]))
+        state["version"] = len(states) + 1
+        states.append(state)
+    return states
+
+
+def tender_edit(prefix: str, index: int):
+    def edit(rng: random.Random, state: dict) -> dict:
+        kind = rng.choices(("status", "description", "name", "service"), (4, 4, 1, 1))
+        if kind[0] == "status" and state["status"] != "Closed":
+            if state["status"] == "Created":
+                state["status"] = "Published"
+            else:
+                state["status"] = rng.choices(("Closed", "Created"), (3, 1))[0]
+        elif kind[0] == "name":
+            state["name"] = f"{prefix}-{index} {words(rng, 2, 4)}"[:100]
+        elif kind[0] == "service":
+            state["service_type"] = rng.choice(SERVICE_TYPES)
+        else:
+            state["description"] = words(rng, 5, 40)
+        return state
+
+    return edit
+
+
+def bid_edit(prefix: str, index: str):
+    def edit(rng: random.Random, state: dict) -> dict:
+        kind = rng.choices(("status", "description", "name"), (3, 4, 1))
+        if kind[0] == "status" and state["status"] == "Created":
+            state["status"] = "Published"
+        elif kind[0] == "status" and state["status"] == "Published":
+            state["status"] = "Canceled"
+        elif kind[0] == "name":
+            state["name"] = f"{prefix}-{index} {words(rng, 2, 4)}"[:100]
+        else:
+            state["description"] = words(rng, 5, 30)
+        return state
+
+    return edit
+
+
+def generate_tender(plan: Plan, index: int, rows: dict[str, list]) -> None:
+    rng = random.Random((plan.seed << 40) | index)
+    tender_id = random_id(rng)
+    organization = plan.pick_organization(rng)
+    creator = plan.username(plan.pick_responsible(rng, organization))
+
+    states = evolve(
+        rng,
+        [
+            {
+                "name": f"{plan.prefix}-{index} {words(rng, 2, 4)}"[:100],
+                "description": words(rng, 5, 40),
+                "service_type": rng.choice(SERVICE_TYPES),
+                "status": rng.choices(TENDER_STATUSES[:2], (1, 2))[0],
+                "organization_id": plan.organization_id(organization),
+                "version": 1,
+                "creator_username": creator,
+            }
+        ],
+        1 + long_tail(rng, plan.versions - 1, 99),
+        tender_edit(plan.prefix, index),
+    )
+    times = [BASE_TIME + PERIOD * rng.random()]
+    for _ in states[1:]:
+        times.append(later(rng, times[-1]))
+
+    tender = states[-1]
+    rows["tender"].append(
+        (tender_id, *(tender[field] for field in TENDER_FIELDS), times[0])
+    )
+    rows["tender_version"].extend(
+        history_rows(
+            states, TENDER_FIELDS, times, tender_id, plan.snapshot_interval, rng
+        )
+    )
+
+    if all(state["status"] == "Created" for state in states):
+        return
+
+    # Решения принимают ответственные за организацию тендера.
+    start, count = plan.responsibles[organization]
+    deciders = [plan.username(start + offset) for offset in range(count)]
+    quorum = min(QUORUM_LIMIT, len(deciders))
+    winner_needed = tender["status"] == "Closed"
+
+    for number in range(long_tail(rng, plan.bids, MAX_BIDS)):
+        bid_id, status, created_at = generate_bid(
+            plan, rng, f"{index}-{number}", tender_id, tender, times[0], rows
+        )
+
+        approved = rejected = 0
+        if status == "Published" and winner_needed:
+            approved = quorum
+            winner_needed = False
+        elif status == "Published" and quorum > 1 and rng.random() < 0.2:
+            approved = 1
+        elif status == "Canceled" and rng.random() < 0.5:
+            rejected = 1
+
+        deciding = rng.sample(deciders, approved + rejected)
+        rows["bid_decision"].extend(
+            (random_id(rng), bid_id, "Approved" if approved else "Rejected", username)
+            for username in deciding
+        )
+        if deciding:
+            rows["bid_decision_tally"].append((bid_id, approved, rejected))
+
+        if status == "Published":
+            moment = created_at
+            for _ in range(rng.choices((0, 1, 2, 3), (6, 2, 1, 1))[0]):
+                moment = later(rng, moment)
+                rows["bid_review"].append(
+                    (random_id(rng), words(rng, 3, 30), bid_id, moment)
+                )
+
+
+def generate_bid(
+    plan: Plan,
+    rng: random.Random,
+    index: str,
+    tender_id: uuid.UUID,
+    tender: dict,
+    tender_created_at: datetime,
+    rows: dict[str, list],
+) -> tuple[uuid.UUID, str, datetime]:
+    bid_id = random_id(rng)
+
+    # От имени организации можно предлагать только чужому тендеру.
+    organization = plan.pick_organization(rng)
+    if (
+        plan.organization_id(organization) == tender["organization_id"]
+        or rng.random() < 0.5
+    ):
+        author_type, organization_id = "User", None
+        start, count = plan.plain_users
+        author = start + rng.randrange(count)
+    else:
+        author_type = "Organization"
+        organization_id = plan.organization_id(organization)
+        author = plan.pick_responsible(rng, organization)
+
+    states = evolve(
+        rng,
+        [
+            {
+                "name": f"{plan.prefix}-{index} {words(rng, 2, 4)}"[:100],
+                "description": words(rng, 5, 30),
+                "status": "Created",
+                "author_type": author_type,
+                "author_id": plan.user_id(author),
+                "tender_id": tender_id,
+                "version": 1,
+            }
+        ],
+        1 + long_tail(rng, plan.versions - 1, 99),
+        bid_edit(plan.prefix, index),
+    )
+    times = [later(rng, tender_created_at, hours=24 * 30)]
+    for _ in states[1:]:
+        times.append(later(rng, times[-1]))
+
+    bid = states[-1]
+    rows["bid"].append((bid_id, *(bid[field] for field in BID_FIELDS), times[0]))
+    rows["bid_version"].extend(
+        history_rows(states, BID_FIELDS, times, bid_id, plan.snapshot_interval, rng)
+    )
+    rows["bid_responsible"].append((random_id(rng), bid_id, organization_id))
+    return bid_id, bid["status"], times[0]
+
+
+async def connect(replica: bool = False) -> asyncpg.Connection:
+    url = make_url(settings.POSTGRES_CONN).set(drivername="postgresql")
+    connection = await asyncpg.connect(url.render_as_string(hide_password=False))
+    if replica:
+        await connection.execute("SET session_replication_role = replica")
+    return connection
+
+
+async def copy_rows(connection: asyncpg.Connection, rows: dict[str, list]) -> None:
+    async with connection.transaction():
+        for table, columns in CHUNK_TABLES.items():
+            if rows.get(table):
+                await connection.copy_records_to_table(
+                    table, records=rows[table], columns=list(columns)
+                )
+
+
+async def _write_chunk(plan: Plan, start: int, stop: int, replica: bool) -> Counter:
+    rows = defaultdict(list)
+    for index in range(start, stop):
+        generate_tender(plan, index, rows)
+
+    connection = await connect(replica)
+    try:
+        await copy_rows(connection, rows)
+    finally:
+        await connection.close()
+    return Counter({table: len(records) for table, records in rows.items()})
+
+
+def write_chunk(plan: Plan, start: int, stop: int, replica: bool) -> Counter:
+    return asyncio.run(_write_chunk(plan, start, stop, replica))
+
+
+def make_plan(args: argparse.Namespace) -> tuple[Plan, dict[str, list]]:
+    """
+    Организации, пользователи и ответственные. Их немного, они пишутся
+    одной транзакцией до пачек тендеров.
+    """
+    rng = random.Random(args.seed)
+    weights = [1 / (index + 1) ** args.skew for index in range(args.organizations)]
+
+    responsibles = []
+    next_user = 0
+    for weight in weights:
+        count = max(1, min(MAX_RESPONSIBLES, round(MAX_RESPONSIBLES * weight)))
+        responsibles.append((next_user, count))
+        next_user += count
+
+    plan = Plan(
+        seed=args.seed,
+        prefix=args.prefix,
+        bids=args.bids,
+        versions=args.versions,
+        snapshot_interval=settings.VERSION_SNAPSHOT_INTERVAL,
+        cum_weights=tuple(itertools.accumulate(weights)),
+        responsibles=tuple(responsibles),
+        plain_users=(next_user, max(1, args.users)),
+    )
+
+    rows = defaultdict(list)
+    for index in range(args.organizations):
+        created_at = BASE_TIME - PERIOD * rng.random()
+        rows["organization"].append(
+            (
+                plan.organization_id(index),
+                f"{args.prefix}-o{index}",
+                words(rng, 3, 12),
+                rng.choice(ORGANIZATION_TYPES),
+                created_at,
+                created_at,
+            )
+        )
+    for index in range(sum(plan.plain_users)):
+        created_at = BASE_TIME - PERIOD * rng.random()
+        rows["employee"].append(
+            (
+                plan.user_id(index),
+                plan.username(index),
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+                created_at,
+                created_at,
+            )
+        )
+    for organization, (start, count) in enumerate(plan.responsibles):
+        for index in range(start, start + count):
+            rows["organization_responsible"].append(
+                (
+                    random_id(rng),
+                    plan.organization_id(organization),
+                    plan.user_id(index),
+                )
+            )
+    return plan, rows
+
+
+MEMBER_TABLES = {
+    "organization": (
+        "id",
+        "name",
+        "description",
+        "type",
+        "created_at",
+        "updated_at",
+    ),
+    "employee": (
+        "id",
+        "username",
+        "first_name",
+        "last_name",
+        "created_at",
+        "updated_at",
+    ),
+    "organization_responsible": ("id", "organization_id", "user_id"),
+}
+
+
+async def try_replica(connection: asyncpg.Connection) -> bool:
+    try:
+        await connection.execute("SET session_replication_role = replica")
+    except asyncpg.InsufficientPrivilegeError:
+        return False
+    return True
+
+
+def name_pattern(prefix: str, kind: str) -> str:
+    return f"^{re.escape(prefix)}-{kind}[0-9]+$"
+
+
+# Удаление сгенерированных данных по зависимостям, от листьев к корням.
+# Каскад через внешние ключи здесь не годится: на bid_version.author_id и
+# tender_version.organization_id нет индексов, и каждое удалённое
+# значение оборачивается полным просмотром таблицы истории.
+CLEAN_STATEMENTS = (
+    "CREATE TEMPORARY TABLE clean_tender ON COMMIT DROP AS SELECT id FROM tender "
+    "WHERE organization_id IN (SELECT id FROM clean_organization)",
+    "CREATE TEMPORARY TABLE clean_bid ON COMMIT DROP AS SELECT id FROM bid "
+    "WHERE tender_id IN (SELECT id FROM clean_tender) "
+    "OR author_id IN (SELECT id FROM clean_user)",
+    *(
+        f"DELETE FROM {table} WHERE bid_id IN (SELECT id FROM clean_bid)"
+        for table in (
+            "bid_version",
+            "bid_responsible",
+            "bid_decision",
+            "bid_decision_tally",
+            "bid_review",
+        )
+    ),
+    "DELETE FROM bid WHERE id IN (SELECT id FROM clean_bid)",
+    "DELETE FROM tender_version WHERE tender_id IN (SELECT id FROM clean_tender) "
+    "OR organization_id IN (SELECT id FROM clean_organization)",
+    "DELETE FROM tender WHERE id IN (SELECT id FROM clean_tender)",
+    "DELETE FROM organization_responsible "
+    "WHERE organization_id IN (SELECT id FROM clean_organization) "
+    "OR user_id IN (SELECT id FROM clean_user)",
+    "DELETE FROM organization WHERE id IN (SELECT id FROM clean_organization)",
+    "DELETE FROM employee WHERE id IN (SELECT id FROM clean_user)",
+)
+
+
+async def clean(prefix: str) -> None:
+    organizations = name_pattern(prefix, "o")
+    users = name_pattern(prefix, "u")
+
+    connection = await connect()
+    try:
+        if not await try_replica(connection):
+            # Без прав на replica остаётся медленный каскад.
+            async with connection.transaction():
+                await connection.execute(
+                    "DELETE FROM organization WHERE name ~ $1", organizations
+                )
+                await connection.execute(
+                    "DELETE FROM employee WHERE username ~ $1", users
+                )
+            return
+
+        async with connection.transaction():
+            await connection.execute(
+                "CREATE TEMPORARY TABLE clean_organization ON COMMIT DROP AS "
+                "SELECT id FROM organization WHERE name ~ $1",
+                organizations,
+            )
+            await connection.execute(
+                "CREATE TEMPORARY TABLE clean_user ON COMMIT DROP AS "
+                "SELECT id FROM employee WHERE username ~ $1",
+                users,
+            )
+            for statement in CLEAN_STATEMENTS:
+                status = await connection.execute(statement)
+                if status.startswith("DELETE"):
+                    print(f"  {statement.split()[2]:<24} {status.split()[-1]:>12}")
+    finally:
+        await connection.close()
+
+
+async def prepare(args: argparse.Namespace) -> tuple[Plan, bool]:
+    plan, rows = make_plan(args)
+    connection = await connect()
+    try:
+        exists = await connection.fetchval(
+            "SELECT EXISTS (SELECT FROM employee WHERE username ~ $1)",
+            name_pattern(args.prefix, "u"),
+        )
+        if exists:
+            raise SystemExit(
+                f"данные с префиксом {args.prefix} уже есть, "
+                "удалите их через --clean или выберите другой --prefix"
+            )
+
+        replica = await try_replica(connection)
+        if not replica:
+            print("нет прав на session_replication_role, триггеры будут срабатывать")
+        async with connection.transaction():
+            for table, columns in MEMBER_TABLES.items():
+                await connection.copy_records_to_table(
+                    table, records=rows[table], columns=list(columns)
+                )
+    finally:
+        await connection.close()
+
+    print(
+        f"организаций: {len(rows['organization'])}, "
+        f"пользователей: {len(rows['employee'])}, "
+        f"ответственных: {len(rows['organization_responsible'])}"
+    )
+    return plan, replica
+
+
+async def analyze() -> None:
+    connection = await connect()
+    try:
+        for table in (*MEMBER_TABLES, *CHUNK_TABLES):
+            await connection.execute(f"ANALYZE {table}")
+    finally:
+        await connection.close()
+
+
+def main(args: argparse.Namespace) -> None:
+    if args.clean:
+        asyncio.run(clean(args.prefix))
+        return
+
+    started = time.perf_counter()
+    plan, replica = asyncio.run(prepare(args))
+
+    totals = Counter()
+    chunks = range(0, args.tenders, args.chunk)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                write_chunk, plan, start, min(start + args.chunk, args.tenders), replica
+            )
+            for start in chunks
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            totals += future.result()
+            elapsed = time.perf_counter() - started
+            print(
+                f"пачек {done}/{len(futures)}, тендеров {totals['tender']}, "
+                f"предложений {totals['bid']}, {elapsed:.0f} с",
+                flush=True,
+            )
+
+    asyncio.run(analyze())
+    print(f"готово за {time.perf_counter() - started:.0f} с")
+    for table in CHUNK_TABLES:
+        print(f"  {table:<20} {totals[table]:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenders", type=int, default=1_000_000)
+    parser.add_argument("--organizations", type=int, default=5000)
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=100_000,
+        help="пользователей без организации (авторы предложений)",
+    )
+    parser.add_argument(
+        "--bids",
+        type=float,
+        default=3.0,
+        help="среднее число предложений на опубликованный тендер",
+    )
+    parser.add_argument(
+        "--versions",
+        type=float,
+        default=4.0,
+        help="среднее число версий тендера и предложения",
+    )
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.1,
+        help="показатель закона Ципфа для размеров организаций",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="процессов генерации и загрузки",
+    )
+    parser.add_argument(
+        "--chunk",
+        type=int,
+        default=5000,
+        help="тендеров в одной транзакции COPY",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prefix", default="gen")
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="удалить ранее сгенерированные данные с этим префиксом",
+    )
+    args = parser.parse_args()
+    if args.prefix.endswith("-") or not args.prefix:
+        sys.exit("--prefix не должен быть пустым или заканчиваться на -")
+    main(args)
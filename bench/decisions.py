@@ -0,0 +1,262 @@
+"""
+Нагрузочная проверка кворума решений по предложениям.
+
+Скрипт создаёт отдельную организацию с тремя ответственными, тендер и
+несколько опубликованных предложений, одновременно отправляет сотни
+решений и проверяет, что:
+
+- тендер закрыт ровно один раз (одна версия со статусом Closed);
+- счётчики approved и rejected в bid_decision_tally совпадают с числом
+  записанных решений каждого типа;
+- предложения с записанным отказом отклонены (Canceled).
+
+По первым --rejected предложениям решения Approved чередуются с Rejected,
+по остальным отправляются только Approved.
+
+Созданные данные удаляются по завершении. Скрипт завершается с кодом 1,
+если хотя бы одна проверка не прошла или решение завершилось ошибкой.
+
+    python -m bench.decisions [--decisions 300] [--bids 5] [--rejected 1]
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+
+from sqlalchemy import delete, func, insert, select
+
+from app.database import async_session_maker, dispose_engine
+from app.bid.decisions import submit_decision_query
+from app.bid.models import (
+    Bid,
+    BidAuthorType,
+    BidDecision,
+    BidDecisionTally,
+    BidDecisionType,
+    BidResponsible,
+    BidStatusType,
+)
+from app.organization.models import (
+    Organization,
+    OrganizationResponsible,
+    OrganiztionType,
+)
+from app.tender.models import (
+    Tender,
+    TenderServiceType,
+    TenderStatusType,
+    TenderVersion,
+)
+from app.user.models import User
+
+RESPONSIBLES = 3
+
+
+async def create_fixture(bids: int) -> tuple[uuid.UUID, list[str], uuid.UUID, list]:
+    suffix = uuid.uuid4().hex[:8]
+    organization_id = uuid.uuid4()
+    users = [(uuid.uuid4(), f"stress-{suffix}-{i}") for i in range(RESPONSIBLES)]
+    tender_id = uuid.uuid4()
+    bid_ids = [uuid.uuid4() for _ in range(bids)]
+
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(Organization).values(
+                id=organization_id,
+                name=f"stress-{suffix}",
+                description="",
+                organization_type=OrganiztionType.LLC,
+            )
+        )
+        await session.execute(
+            insert(User),
+            [
+                {"id": user_id, "username": username, "first_name": "", "last_name": ""}
+                for user_id, username in users
+            ],
+        )
+        await session.execute(
+            insert(OrganizationResponsible),
+            [
+                {"organization_id": organization_id, "user_id": user_id}
+                for user_id, _ in users
+            ],
+        )
+        await session.execute(
+            insert(Tender).values(
+                id=tender_id,
+                name=f"stress-{suffix}",
+                description="",
+                service_type=TenderServiceType.Construction,
+                status=TenderStatusType.Published,
+                organization_id=organization_id,
+                version=1,
+                creator_username=users[0][1],
+            )
+        )
+        await session.execute(
+            insert(Bid),
+            [
+                {
+                    "id": bid_id,
+                    "name": f"stress-{suffix}-{i}",
+                    "description": "",
+                    "status": BidStatusType.Published,
+                    "tender_id": tender_id,
+                    "author_type": BidAuthorType.Organization,
+                    "author_id": users[0][0],
+                    "version": 1,
+                }
+                for i, bid_id in enumerate(bid_ids)
+            ],
+        )
+        await session.execute(
+            insert(BidResponsible),
+            [
+                {"bid_id": bid_id, "organization_id": organization_id}
+                for bid_id in bid_ids
+            ],
+        )
+        await session.commit()
+
+    return organization_id, [username for _, username in users], tender_id, bid_ids
+
+
+async def remove_fixture(organization_id: uuid.UUID, usernames: list[str]) -> None:
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(Organization).where(Organization.id == organization_id)
+        )
+        await session.execute(delete(User).where(User.username.in_(usernames)))
+        await session.commit()
+
+
+async def decide(
+    bid_id: uuid.UUID,
+    decision: BidDecisionType,
+    username: str,
+) -> bool:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            submit_decision_query(bid_id, decision, username)
+        )
+        row = result.one()
+        await session.commit()
+    return row.closed_tender_id is not None
+
+
+async def verify(tender_id: uuid.UUID, bid_ids: list) -> list[str]:
+    problems = []
+    async with async_session_maker() as session:
+        closed_versions = await session.scalar(
+            select(func.count()).where(
+                TenderVersion.tender_id == tender_id,
+                TenderVersion.status == TenderStatusType.Closed,
+            )
+        )
+        if closed_versions != 1:
+            problems.append(f"версий закрытия тендера: {closed_versions}")
+
+        recorded = await session.execute(
+            select(BidDecision.bid_id, BidDecision.decision, func.count())
+            .where(BidDecision.bid_id.in_(bid_ids))
+            .group_by(BidDecision.bid_id, BidDecision.decision)
+        )
+        recorded = {(bid_id, decision): count for bid_id, decision, count in recorded}
+        tallies = await session.execute(
+            select(
+                BidDecisionTally.bid_id,
+                BidDecisionTally.approved,
+                BidDecisionTally.rejected,
+            ).where(BidDecisionTally.bid_id.in_(bid_ids))
+        )
+        for bid_id, approved, rejected in tallies.all():
+            for decision, counted in (
+                (BidDecisionType.Approved, approved),
+                (BidDecisionType.Rejected, rejected),
+            ):
+                expected = recorded.get((bid_id, decision), 0)
+                if counted != expected:
+                    problems.append(
+                        f"предложение {bid_id}: счётчик {decision.value} "
+                        f"{counted}, решений {expected}"
+                    )
+
+        statuses = await session.execute(
+            select(Bid.id, Bid.status).where(Bid.id.in_(bid_ids))
+        )
+        for bid_id, status in statuses.all():
+            if (
+                recorded.get((bid_id, BidDecisionType.Rejected))
+                and status != BidStatusType.Canceled
+            ):
+                problems.append(f"предложение {bid_id} с отказом в статусе {status}")
+    return problems
+
+
+def decision_for(i: int, bids: int, rejected: int) -> BidDecisionType:
+    if i % bids < rejected and i // bids % 2:
+        return BidDecisionType.Rejected
+    return BidDecisionType.Approved
+
+
+async def main(decisions: int, bids: int, rejected: int) -> int:
+    organization_id, usernames, tender_id, bid_ids = await create_fixture(bids)
+    try:
+        results = await asyncio.gather(
+            *(
+                decide(
+                    bid_ids[i % bids],
+                    decision_for(i, bids, rejected),
+                    usernames[i % RESPONSIBLES],
+                )
+                for i in range(decisions)
+            ),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        closes = sum(result is True for result in results)
+
+        problems = await verify(tender_id, bid_ids)
+        if closes != 1:
+            problems.append(f"ответов о закрытии тендера: {closes}")
+        if errors:
+            problems.append(f"решений с ошибкой: {len(errors)}")
+
+        print(f"решений: {decisions}, ошибок: {len(errors)}, закрытий: {closes}")
+        for error in errors[:5]:
+            print(f"  {type(error).__name__}: {error}")
+        for problem in problems:
+            print(f"FAIL {problem}")
+    finally:
+        await remove_fixture(organization_id, usernames)
+        await dispose_engine()
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--decisions",
+        type=int,
+        default=300,
+        help="число одновременных решений",
+    )
+    parser.add_argument(
+        "--bids",
+        type=int,
+        default=5,
+        help="число предложений в тендере",
+    )
+    parser.add_argument(
+        "--rejected",
+        type=int,
+        default=1,
+        help="число предложений, по которым отправляются и отказы",
+    )
+    args = parser.parse_args()
+    if not 0 <= args.rejected < args.bids:
+        parser.error("--rejected должно быть меньше --bids")
+    sys.exit(asyncio.run(main(args.decisions, args.bids, args.rejected)))
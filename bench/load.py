@@ -0,0 +1,671 @@
+"""
+Нагрузочный прогон всех эндпоинтов из задание/openapi.yml.
+
+Скрипт создаёт в базе отдельный набор данных (организации с
+ответственными, пользователи, тендеры и предложения), поднимает сервер
+через python -m app.server и гоняет смешанную нагрузку: для каждого
+сценария и каждого уровня конкурентности заданное число клиентов в
+течение --duration секунд отправляют запросы к случайным эндпоинтам.
+
+Сценарии различаются долей записей: read - только чтение, mixed - 20%
+записей, write - 80%. Записи подобраны так, чтобы данные оставались в
+рабочем состоянии: тендеры остаются опубликованными, отклонённые
+предложения снова публикуются их авторами.
+
+По каждому эндпоинту печатаются пропускная способность и задержки
+p50/p95/p99, полный результат сохраняется в JSON (--output), чтобы
+сравнивать прогоны между собой. Ответы с кодом 5xx и сетевые ошибки
+считаются ошибками, остальные коды сохраняются как есть.
+
+С --url сервер не запускается, нагрузка идёт на уже работающий. С
+--in-process приложение вызывается напрямую через ASGI, без сети.
+Созданные данные удаляются по завершении, если не указан --keep.
+Для работы нужен httpx.
+
+    python -m bench.load [--concurrency 1 16 64] [--duration 20]
+        [--scenarios read mixed write] [--tenders 200] [--bids 1000]
+        [--url http://localhost:8080/api] [--output bench-load.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+import httpx
+from sqlalchemy import delete, insert
+
+from app.database import dispose_engine, get_engine
+from app.organization.models import (
+    Organization,
+    OrganizationResponsible,
+    OrganiztionType,
+)
+from app.user.models import User
+
+# Доля запросов на запись в каждом сценарии.
+SCENARIOS = {"read": 0.0, "mixed": 0.2, "write": 0.8}
+
+SEED_CONCURRENCY = 32
+
+
+@dataclass
+class Member:
+    id: str
+    username: str
+
+
+@dataclass
+class TenderRef:
+    id: str
+    owner: Member
+
+
+@dataclass
+class BidRef:
+    id: str
+    tender: TenderRef
+    author: Member
+
+
+@dataclass
+class Fixture:
+    prefix: str
+    organization_ids: list[str]
+    responsibles: list[list[Member]]
+    users: list[Member]
+    tenders: list[TenderRef] = field(default_factory=list)
+    bids: list[BidRef] = field(default_factory=list)
+    counter: int = 0
+
+    def next_name(self, kind: str) -> str:
+        self.counter += 1
+        return f"{self.prefix}-{kind}{self.counter}"
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    params: dict | None = None
+    json: dict | None = None
+
+
+def tender_body(fixture: Fixture, organization: int, owner: Member) -> dict:
+    return {
+        "name": fixture.next_name("t"),
+        "description": "Поставка бетона и арматуры для нагрузочного прогона",
+        "service_type": random.choice(["Construction", "Delivery", "Manufacture"]),
+        "status": "Published",
+        "organization_id": fixture.organization_ids[organization],
+        "creator_username": owner.username,
+    }
+
+
+def bid_body(fixture: Fixture, tender: TenderRef) -> tuple[dict, Member]:
+    # От имени организации можно предлагать только чужому тендеру.
+    organizations = [
+        members for members in fixture.responsibles if tender.owner not in members
+    ]
+    if not organizations or random.random() < 0.5:
+        author = random.choice(fixture.users)
+        author_type = "User"
+    else:
+        author = random.choice(random.choice(organizations))
+        author_type = "Organization"
+
+    body = {
+        "name": fixture.next_name("b"),
+        "description": "Сделаем в срок",
+        "tender_id": tender.id,
+        "author_type": author_type,
+        "author_id": author.id,
+    }
+    return body, author
+
+
+def random_owner(fixture: Fixture) -> tuple[int, Member]:
+    organization = random.randrange(len(fixture.organization_ids))
+    return organization, random.choice(fixture.responsibles[organization])
+
+
+def random_username(fixture: Fixture) -> str:
+    if random.random() < 0.5:
+        return random.choice(fixture.users).username
+    return random_owner(fixture)[1].username
+
+
+# Запросы к эндпоинтам: имя - (запись ли это, построение запроса).
+# Построение получает набор данных и возвращает Request и функцию,
+# которая учитывает созданную сущность по успешному ответу.
+Builder = Callable[[Fixture], tuple[Request, Callable[[dict], None] | None]]
+
+
+def create_tender(fixture: Fixture):
+    organization, owner = random_owner(fixture)
+    request = Request(
+        "POST", "/tenders/new", json=tender_body(fixture, organization, owner)
+    )
+
+    def created(body: dict) -> None:
+        fixture.tenders.append(TenderRef(body["id"], owner))
+
+    return request, created
+
+
+def create_bid(fixture: Fixture):
+    tender = random.choice(fixture.tenders)
+    body, author = bid_body(fixture, tender)
+
+    def created(response: dict) -> None:
+        fixture.bids.append(BidRef(response["id"], tender, author))
+
+    return Request("POST", "/bids/new", json=body), created
+
+
+def tender_request(method: str, suffix: str, params: dict | None = None, body=None):
+    def build(fixture: Fixture):
+        tender = random.choice(fixture.tenders)
+        return (
+            Request(
+                method,
+                f"/tenders/{tender.id}{suffix}",
+                {"username": tender.owner.username, **(params or {})},
+                body,
+            ),
+            None,
+        )
+
+    return build
+
+
+def bid_request(method: str, suffix: str, params: dict | None = None, body=None):
+    def build(fixture: Fixture):
+        bid = random.choice(fixture.bids)
+        return (
+            Request(
+                method,
+                f"/bids/{bid.id}{suffix}",
+                {"username": bid.author.username, **(params or {})},
+                body,
+            ),
+            None,
+        )
+
+    return build
+
+
+def bid_review_request(suffix: str, params: dict):
+    # Решения и отзывы оставляют ответственные за организацию тендера.
+    def build(fixture: Fixture):
+        bid = random.choice(fixture.bids)
+        return (
+            Request(
+                "PUT",
+                f"/bids/{bid.id}{suffix}",
+                {"username": bid.tender.owner.username, **params},
+            ),
+            None,
+        )
+
+    return build
+
+
+def tender_bids(fixture: Fixture):
+    tender = random.choice(fixture.tenders)
+    return (
+        Request("GET", f"/bids/{tender.id}/list", {"username": tender.owner.username}),
+        None,
+    )
+
+
+def bid_reviews(fixture: Fixture):
+    bid = random.choice(fixture.bids)
+    params = {
+        "author_username": bid.author.username,
+        "requester_username": bid.tender.owner.username,
+    }
+    return Request("GET", f"/bids/{bid.tender.id}/reviews", params), None
+
+
+OPERATIONS: dict[str, tuple[bool, Builder]] = {
+    "GET /ping": (False, lambda f: (Request("GET", "/ping"), None)),
+    "GET /tenders": (
+        False,
+        lambda f: (Request("GET", "/tenders", {"username": random_username(f)}), None),
+    ),
+    "POST /tenders/new": (True, create_tender),
+    "GET /tenders/my": (
+        False,
+        lambda f: (
+            Request("GET", "/tenders/my", {"username": random_owner(f)[1].username}),
+            None,
+        ),
+    ),
+    "GET /tenders/{tenderId}/status": (False, tender_request("GET", "/status")),
+    "PUT /tenders/{tenderId}/status": (
+        True,
+        tender_request("PUT", "/status", {"status": "Published"}),
+    ),
+    "PATCH /tenders/{tenderId}/edit": (
+        True,
+        tender_request("PATCH", "/edit", body={"description": "Обновлённое описание"}),
+    ),
+    "PUT /tenders/{tenderId}/rollback/{version}": (
+        True,
+        tender_request("PUT", "/rollback/1"),
+    ),
+    "POST /bids/new": (True, create_bid),
+    "GET /bids/my": (
+        False,
+        lambda f: (
+            Request(
+                "GET", "/bids/my", {"username": random.choice(f.bids).author.username}
+            ),
+            None,
+        ),
+    ),
+    "GET /bids/{tenderId}/list": (False, tender_bids),
+    "GET /bids/{bidId}/status": (False, bid_request("GET", "/status")),
+    "PUT /bids/{bidId}/status": (
+        True,
+        bid_request("PUT", "/status", {"status": "Published"}),
+    ),
+    "PATCH /bids/{bidId}/edit": (
+        True,
+        bid_request("PATCH", "/edit", body={"description": "Уточнили сроки"}),
+    ),
+    "PUT /bids/{bidId}/submit_decision": (
+        True,
+        bid_review_request("/submit_decision", {"decision": "Rejected"}),
+    ),
+    "PUT /bids/{bidId}/feedback": (
+        True,
+        bid_review_request("/feedback", {"bid_feedback": "Нужна смета"}),
+    ),
+    "PUT /bids/{bidId}/rollback/{version}": (True, bid_request("PUT", "/rollback/1")),
+    "GET /bids/{tenderId}/reviews": (False, bid_reviews),
+}
+
+READS = [name for name, (write, _) in OPERATIONS.items() if not write]
+WRITES = [name for name, (write, _) in OPERATIONS.items() if write]
+
+
+async def send(client: httpx.AsyncClient, request: Request) -> httpx.Response:
+    return await client.request(
+        request.method, request.path, params=request.params, json=request.json
+    )
+
+
+async def create_members(organizations: int, responsibles: int, users: int) -> Fixture:
+    prefix = f"load-{uuid.uuid4().hex[:8]}"
+    organization_ids = [str(uuid.uuid4()) for _ in range(organizations)]
+    members = [
+        [Member(str(uuid.uuid4()), f"{prefix}-o{i}-r{j}") for j in range(responsibles)]
+        for i in range(organizations)
+    ]
+    plain = [Member(str(uuid.uuid4()), f"{prefix}-u{i}") for i in range(users)]
+
+    async with get_engine().begin() as connection:
+        await connection.execute(
+            insert(Organization),
+            [
+                {
+                    "id": organization_id,
+                    "name": f"{prefix}-o{i}",
+                    "description": "",
+                    "organization_type": OrganiztionType.LLC,
+                }
+                for i, organization_id in enumerate(organization_ids)
+            ],
+        )
+        await connection.execute(
+            insert(User),
+            [
+                {
+                    "id": member.id,
+                    "username": member.username,
+                    "first_name": "",
+                    "last_name": "",
+                }
+                for member in [*sum(members, []), *plain]
+            ],
+        )
+        await connection.execute(
+            insert(OrganizationResponsible),
+            [
+                {"organization_id": organization_ids[i], "user_id": member.id}
+                for i, organization in enumerate(members)
+                for member in organization
+            ],
+        )
+
+    return Fixture(prefix, organization_ids, members, plain)
+
+
+async def seed_entities(
+    client: httpx.AsyncClient, fixture: Fixture, tenders: int, bids: int
+) -> None:
+    """
+    Тендеры и предложения создаются через API, чтобы у них были версии и
+    все связанные записи, как у настоящих. Половина предложений
+    публикуется.
+    """
+    semaphore = asyncio.Semaphore(SEED_CONCURRENCY)
+
+    async def call(build: Builder) -> dict:
+        request, created = build(fixture)
+        async with semaphore:
+            response = await send(client, request)
+        response.raise_for_status()
+        body = response.json()
+        if created is not None:
+            created(body)
+        return body
+
+    await asyncio.gather(*(call(create_tender) for _ in range(tenders)))
+    await asyncio.gather(*(call(create_bid) for _ in range(bids)))
+    await asyncio.gather(
+        *(
+            call(bid_request("PUT", "/status", {"status": "Published"}))
+            for _ in range(bids // 2)
+        )
+    )
+
+
+async def delete_fixture(fixture: Fixture) -> None:
+    # Тендеры и предложения удаляются каскадом вместе с организациями и авторами.
+    async with get_engine().begin() as connection:
+        await connection.execute(
+            delete(Organization).where(Organization.id.in_(fixture.organization_ids))
+        )
+        await connection.execute(
+            delete(User).where(User.username.startswith(f"{fixture.prefix}-"))
+        )
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    # Метод ближайшего ранга по отсортированному списку.
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def summarize(latencies: list[float], statuses: Counter, duration: float) -> dict:
+    latencies = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if status >= 500)
+    return {
+        "requests": len(latencies),
+        "throughput": round(len(latencies) / duration, 2),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    fixture: Fixture,
+    scenario: str,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> dict:
+    write_share = SCENARIOS[scenario]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def worker() -> None:
+        while True:
+            name = random.choice(WRITES if random.random() < write_share else READS)
+            request, created = OPERATIONS[name][1](fixture)
+
+            sent = time.perf_counter()
+            if sent >= stop_at:
+                return
+            try:
+                response = await send(client, request)
+                status = response.status_code
+            except httpx.HTTPError:
+                response, status = None, 599
+            finished = time.perf_counter()
+
+            if created is not None and response is not None and status == 200:
+                created(response.json())
+            if sent >= measure_from:
+                latencies[name].append((finished - sent) * 1000)
+                statuses[name][status] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    total_latencies = [value for values in latencies.values() for value in values]
+    total_statuses = sum(statuses.values(), Counter())
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "duration": duration,
+        "total": summarize(total_latencies, total_statuses, duration),
+        "endpoints": {
+            name: summarize(latencies[name], statuses[name], duration)
+            for name in OPERATIONS
+            if name in latencies
+        },
+    }
+
+
+def print_level(result: dict) -> None:
+    print(
+        f"\n{result['scenario']}, конкурентность {result['concurrency']}: "
+        f"{result['total']['throughput']} запр/с, "
+        f"ошибок {result['total']['errors']}"
+    )
+    print(f"{'endpoint':<44} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for name, stats in [*result["endpoints"].items(), ("всего", result["total"])]:
+        print(
+            f"{name:<44} {stats['throughput']:>8.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>5}"
+        )
+
+
+@contextlib.asynccontextmanager
+async def open_client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=max(max(args.concurrency), SEED_CONCURRENCY))
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.in_process:
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=timeout
+            ) as client:
+                yield client
+        return
+
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}/api"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.server"],
+            env={
+                **os.environ,
+                "SERVER_ADDRESS": f"127.0.0.1:{args.port}",
+                "SERVER_WORKERS": str(args.workers),
+            },
+        )
+
+    try:
+        async with httpx.AsyncClient(
+            base_url=url, limits=limits, timeout=timeout
+        ) as client:
+            await wait_ready(client, server)
+            yield client
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen | None):
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"сервер завершился с кодом {server.returncode}")
+        with contextlib.suppress(httpx.HTTPError):
+            if (await client.get("/ping")).status_code == 200:
+                return
+        await asyncio.sleep(0.2)
+    raise RuntimeError("сервер не ответил на /ping за 60 секунд")
+
+
+def git_revision() -> str | None:
+    with contextlib.suppress(OSError, subprocess.CalledProcessError):
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    return None
+
+
+async def main(args: argparse.Namespace) -> int:
+    random.seed(args.seed)
+    fixture = await create_members(args.organizations, args.responsibles, args.users)
+    results = []
+    try:
+        async with open_client(args) as client:
+            started = time.perf_counter()
+            await seed_entities(client, fixture, args.tenders, args.bids)
+            print(
+                f"создано тендеров: {len(fixture.tenders)}, "
+                f"предложений: {len(fixture.bids)} "
+                f"за {time.perf_counter() - started:.1f} с"
+            )
+
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    result = await run_level(
+                        client,
+                        fixture,
+                        scenario,
+                        concurrency,
+                        args.duration,
+                        args.warmup,
+                    )
+                    print_level(result)
+                    results.append(result)
+    finally:
+        if not args.keep:
+            await delete_fixture(fixture)
+        await dispose_engine()
+
+    report = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "target": "in-process" if args.in_process else args.url or "app.server",
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "keep")
+        },
+        "runs": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, ensure_ascii=False, indent=2)
+    print(f"\nрезультаты сохранены в {args.output}")
+
+    return 1 if any(result["total"]["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+        help="сценарии нагрузки",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 16, 64],
+        help="уровни конкурентности (число одновременных клиентов)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=20.0,
+        help="длительность измерения на каждом уровне, секунд",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=3.0,
+        help="прогрев перед измерением на каждом уровне, секунд",
+    )
+    parser.add_argument("--organizations", type=int, default=10)
+    parser.add_argument(
+        "--responsibles",
+        type=int,
+        default=3,
+        help="ответственных в каждой организации",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=50,
+        help="пользователей без организации",
+    )
+    parser.add_argument("--tenders", type=int, default=200)
+    parser.add_argument("--bids", type=int, default=1000)
+    parser.add_argument(
+        "--url",
+        help="адрес работающего сервера вместе с /api; без него запускается свой",
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="вызывать приложение напрямую через ASGI, без сервера",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8089,
+        help="порт запускаемого сервера",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="воркеров запускаемого сервера",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-load.json")
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="не удалять созданные данные",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
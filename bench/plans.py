@@ -0,0 +1,218 @@
+"""
+Проверка планов горячих запросов роутеров.
+
+Запросы строятся теми же функциями, что и в роутерах, поэтому проверяется
+ровно тот SQL, который выполняет приложение. Для каждого запроса
+выполняется EXPLAIN (FORMAT JSON) и проверяется, что ни одна из
+нагруженных таблиц не читается последовательным сканированием.
+Скрипт завершается с кодом 1, если хотя бы один план регрессировал.
+
+Проверка имеет смысл только на заполненной базе: на маленьких таблицах
+планировщик честно выбирает Seq Scan. Поэтому скрипт сначала проверяет,
+что в tender не меньше --min-tenders строк (по умолчанию миллион), и
+иначе завершается с кодом 2. Эталонный прогон:
+
+    python -m bench.dataset --tenders 1000000
+    python -m bench.plans --analyze
+
+    python -m bench.plans [--analyze] [--min-tenders 1000000]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Select, func, select
+
+from app.database import dispose_engine, get_engine
+from app.bid.decisions import submit_decision_query
+from app.bid.models import Bid, BidDecisionType, BidVersion
+from app.bid.routers import (
+    BID_KEYSET,
+    BID_REVIEW_KEYSET,
+    bid_reviews_query,
+    bid_state_query,
+    user_bids_query,
+    visible_bids_query,
+)
+from app.bid.schemas import BidSchema
+from app.organization.models import OrganizationResponsible
+from app.pagination import paginate
+from app.tender.cache import published_page_query
+from app.tender.models import Tender, TenderServiceType, TenderVersion
+from app.tender.routers import (
+    search_tenders_query,
+    tender_state_query,
+    user_tenders_query,
+)
+from app.tender.schemas import TenderSchema
+from app.tender.visibility import TENDER_KEYSET, visible_tenders_query
+from app.user.models import User
+from app.versioning import version_chain_query
+
+WATCHED_TABLES = {
+    "employee",
+    "tender",
+    "tender_version",
+    "bid",
+    "bid_version",
+    "bid_decision",
+    "bid_review",
+    "bid_responsible",
+    "organization_responsible",
+}
+
+
+@dataclass
+class Sample:
+    username: str
+    user_id: object
+    tender_id: object
+    tender_name: str
+    bid_id: object
+    organizations: list
+
+
+LIMIT = 5
+
+HOT_QUERIES: dict[str, Callable[[Sample], Select]] = {
+    "get_tenders": lambda s: visible_tenders_query(
+        s.username, [], TENDER_KEYSET, LIMIT, 0, None, TenderSchema
+    ),
+    "get_tenders_service_type": lambda s: visible_tenders_query(
+        s.username,
+        [Tender.service_type == TenderServiceType.Construction],
+        TENDER_KEYSET,
+        LIMIT,
+        0,
+        None,
+        TenderSchema,
+    ),
+    "published_page": lambda s: published_page_query(None, LIMIT, 0, None),
+    "published_page_service_type": lambda s: published_page_query(
+        TenderServiceType.Construction, LIMIT, 0, None
+    ),
+    # Поиск по названию реального тендера: частое слово совпало бы с
+    # заметной долей таблицы, и Seq Scan был бы честным выбором.
+    "search_tenders": lambda s: search_tenders_query(
+        s.username, s.tender_name, None, LIMIT, 0, None
+    ),
+    "get_user_tenders": lambda s: paginate(
+        user_tenders_query(s.username), TENDER_KEYSET, LIMIT
+    ),
+    "get_tender_status": lambda s: tender_state_query(s.tender_id),
+    "tender_version": lambda s: version_chain_query(
+        TenderVersion, "tender_id", s.tender_id, 1
+    ),
+    "get_user_bids": lambda s: paginate(
+        user_bids_query(s.user_id, BidSchema), BID_KEYSET, LIMIT
+    ),
+    "get_tender_bids": lambda s: paginate(
+        visible_bids_query(s.tender_id, s.user_id, s.organizations, BidSchema),
+        BID_KEYSET,
+        LIMIT,
+    ),
+    "get_bid_status": lambda s: bid_state_query(s.bid_id),
+    "bid_version": lambda s: version_chain_query(BidVersion, "bid_id", s.bid_id, 1),
+    "submit_decision_approved": lambda s: submit_decision_query(
+        s.bid_id, BidDecisionType.Approved, s.username
+    ),
+    "submit_decision_rejected": lambda s: submit_decision_query(
+        s.bid_id, BidDecisionType.Rejected, s.username
+    ),
+    "tender_reviews": lambda s: paginate(
+        bid_reviews_query(s.tender_id, s.user_id), BID_REVIEW_KEYSET, LIMIT
+    ),
+    "user_by_username": lambda s: select(User.id, User.username).where(
+        User.username == s.username
+    ),
+}
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan["Relation Name"] in WATCHED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", ()):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def load_sample(connection) -> Sample:
+    query = (
+        select(User.username, User.id, Tender.id, Tender.name, Bid.id)
+        .join(OrganizationResponsible, OrganizationResponsible.user_id == User.id)
+        .join(Tender, Tender.organization_id == OrganizationResponsible.organization_id)
+        .join(Bid, Bid.tender_id == Tender.id)
+        .limit(1)
+    )
+    result = await connection.execute(query)
+    row = result.one_or_none()
+    if row is None:
+        raise SystemExit("База пуста: заполните её перед проверкой планов")
+
+    organizations = await connection.execute(
+        select(OrganizationResponsible.organization_id).where(
+            OrganizationResponsible.user_id == row[1]
+        )
+    )
+    return Sample(*row, organizations.scalars().all())
+
+
+async def main(analyze: bool, min_tenders: int) -> int:
+    failed = []
+    engine = get_engine()
+    async with engine.connect() as connection:
+        if analyze:
+            await connection.exec_driver_sql("ANALYZE")
+
+        tenders = await connection.scalar(select(func.count()).select_from(Tender))
+        print(f"тендеров в базе: {tenders}")
+        if tenders < min_tenders:
+            print(
+                f"Нужно не меньше {min_tenders} тендеров: "
+                f"python -m bench.dataset --tenders {min_tenders}"
+            )
+            await dispose_engine()
+            return 2
+
+        sample = await load_sample(connection)
+        for name, build in HOT_QUERIES.items():
+            sql = build(sample).compile(
+                dialect=engine.dialect,
+                compile_kwargs={"literal_binds": True},
+            )
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+            explained = result.scalar_one()
+            if isinstance(explained, str):
+                explained = json.loads(explained)
+            plan = explained[0]["Plan"]
+            tables = seq_scans(plan)
+
+            status = "FAIL" if tables else "ok"
+            print(f"{status:4} {name:28} {', '.join(tables)}")
+            if tables:
+                failed.append(name)
+
+    await dispose_engine()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="выполнить ANALYZE перед проверкой",
+    )
+    parser.add_argument(
+        "--min-tenders",
+        type=int,
+        default=1_000_000,
+        help="минимальное число тендеров, на котором проверка имеет смысл",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.analyze, args.min_tenders)))
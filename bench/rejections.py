@@ -0,0 +1,140 @@
+"""
+Регрессионная проверка отказа по предложению.
+
+Скрипт создаёт тендер с несколькими опубликованными предложениями,
+отправляет отказ по одному из них и проверяет, что:
+
+- транзакция решения изменила ровно одну строку bid и добавила ровно
+  одну строку bid_version, а тендер не тронут;
+- отклонённое предложение получило статус Canceled и следующую версию;
+- остальные предложения сохранили статус, версию и историю;
+- отклонённое и затем снова опубликованное предложение не закрывает
+  тендер даже после одобрения всеми ответственными.
+
+Созданные данные удаляются по завершении. Скрипт завершается с кодом 1,
+если хотя бы одна проверка не прошла.
+
+    python -m bench.rejections [--bids 5]
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+
+from sqlalchemy import func, literal_column, select, update
+
+from app.bid.decisions import submit_decision_query
+from app.bid.models import Bid, BidDecisionType, BidStatusType, BidVersion
+from app.database import Base, async_session_maker, dispose_engine
+from app.tender.models import Tender
+from bench.decisions import RESPONSIBLES, create_fixture, decide, remove_fixture
+
+
+def written_here(model: type[Base]):
+    """Число строк model, записанных текущей транзакцией."""
+    # xmin хранит 32-битный номер транзакции, txid_current() - с эпохой.
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(literal_column("xmin::text::bigint") == func.txid_current() % 2**32)
+    )
+
+
+async def bid_states(bid_ids: list) -> dict:
+    async with async_session_maker() as session:
+        history = (
+            select(BidVersion.bid_id, func.count().label("versions"))
+            .where(BidVersion.bid_id.in_(bid_ids))
+            .group_by(BidVersion.bid_id)
+            .subquery()
+        )
+        result = await session.execute(
+            select(Bid.id, Bid.status, Bid.version, history.c.versions)
+            .outerjoin(history, history.c.bid_id == Bid.id)
+            .where(Bid.id.in_(bid_ids))
+        )
+        return {
+            bid_id: (status, version, versions or 0)
+            for bid_id, status, version, versions in result.all()
+        }
+
+
+async def reject(bid_id: uuid.UUID, username: str) -> dict[str, int]:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            submit_decision_query(bid_id, BidDecisionType.Rejected, username)
+        )
+        written = {"result": len(result.all())}
+        written |= {
+            model.__tablename__: await session.scalar(written_here(model))
+            for model in (Bid, BidVersion, Tender)
+        }
+        await session.commit()
+    return written
+
+
+async def republish_and_approve(bid_id: uuid.UUID, usernames: list[str]) -> int:
+    """Снова опубликовать предложение и одобрить его; вернуть число закрытий."""
+    async with async_session_maker() as session:
+        await session.execute(
+            update(Bid)
+            .where(Bid.id == bid_id)
+            .values(status=BidStatusType.Published, version=Bid.version + 1)
+        )
+        await session.commit()
+
+    closes = 0
+    for username in usernames[:RESPONSIBLES]:
+        closes += await decide(bid_id, BidDecisionType.Approved, username)
+    return closes
+
+
+async def main(bids: int) -> int:
+    organization_id, usernames, tender_id, bid_ids = await create_fixture(bids)
+    problems = []
+    try:
+        rejected, *others = bid_ids
+        before = await bid_states(bid_ids)
+        written = await reject(rejected, usernames[0])
+        after = await bid_states(bid_ids)
+
+        expected = {"result": 1, "bid": 1, "bid_version": 1, "tender": 0}
+        for table, count in expected.items():
+            if written[table] != count:
+                problems.append(f"строк {table}: {written[table]}, ожидалось {count}")
+
+        status, version, versions = before[rejected]
+        if after[rejected] != (BidStatusType.Canceled, version + 1, versions + 1):
+            problems.append(f"отклонённое предложение: {after[rejected]}")
+        for bid_id in others:
+            if after[bid_id] != before[bid_id]:
+                problems.append(
+                    f"предложение {bid_id}: было {before[bid_id]}, "
+                    f"стало {after[bid_id]}"
+                )
+
+        closes = await republish_and_approve(rejected, usernames)
+        if closes:
+            problems.append("отклонённое предложение закрыло тендер")
+
+        print(f"предложений: {bids}, записано транзакцией отказа: {written}")
+        for problem in problems:
+            print(f"FAIL {problem}")
+    finally:
+        await remove_fixture(organization_id, usernames)
+        await dispose_engine()
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--bids",
+        type=int,
+        default=5,
+        help="число предложений в тендере",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.bids)))
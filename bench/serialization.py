@@ -0,0 +1,117 @@
+"""
+Сравнение сериализации списочных ответов.
+
+Для каждого размера страницы одни и те же объекты Tender отдаются через
+FastAPI тремя способами: обычным путём по response_model (default) и
+через ListSerializer в режимах adapter и orjson. База не нужна.
+
+    python -m bench.serialization [--sizes 5 50 200 1000] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import datetime
+import importlib
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Response
+
+from app.serialization import ListSerializer
+from app.tender.models import Tender, TenderServiceType, TenderStatusType
+from app.tender.schemas import TenderSchema
+
+# Связи Tender ссылаются на Bid: модель должна быть зарегистрирована.
+importlib.import_module("app.bid.models")
+
+TENDER_LIST = ListSerializer(TenderSchema)
+
+
+def make_tenders(count: int) -> list[Tender]:
+    return [
+        Tender(
+            id=uuid.uuid4(),
+            name=f"Тендер {i}",
+            description="Поставка бетона и арматуры " * 4,
+            service_type=TenderServiceType.Construction,
+            status=TenderStatusType.Published,
+            organization_id=uuid.uuid4(),
+            version=i % 7 + 1,
+            creator_username="user",
+            created_at=datetime.datetime(2024, 9, 1) + datetime.timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def make_app(tenders: list[Tender]) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/default")
+    async def default() -> list[TenderSchema]:
+        return tenders
+
+    @bench_app.get("/adapter")
+    async def adapter():
+        return Response(
+            TENDER_LIST.adapter_body(tenders), media_type="application/json"
+        )
+
+    @bench_app.get("/orjson")
+    async def orjson():
+        return Response(TENDER_LIST.orjson_body(tenders), media_type="application/json")
+
+    return bench_app
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    await client.get(path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await client.get(path)
+    return (time.perf_counter() - started) / requests * 1000
+
+
+async def main(sizes: list[int], requests: int) -> None:
+    print(f"{'size':>6} {'default':>10} {'adapter':>10} {'orjson':>10}   мс/запрос")
+    for size in sizes:
+        bench_app = make_app(make_tenders(size))
+        transport = httpx.ASGITransport(app=bench_app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            bodies = {
+                path: (await client.get(path)).json()
+                for path in ("/default", "/adapter", "/orjson")
+            }
+            assert bodies["/default"] == bodies["/adapter"] == bodies["/orjson"]
+
+            timings = [
+                await measure(client, path, requests)
+                for path in ("/default", "/adapter", "/orjson")
+            ]
+        default, adapter, orjson = timings
+        print(
+            f"{size:>6} {default:>10.3f} {adapter:>10.3f} {orjson:>10.3f}"
+            f"   x{default / adapter:.1f} / x{default / orjson:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[5, 50, 200, 1000],
+        help="размеры страниц",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="запросов на каждый способ и размер",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.requests))